@@ -0,0 +1,175 @@
+"""
+Benchmark and regression check for the CRC algorithms in crc_algorithms.py.
+
+Measures bit_by_bit, bit_by_bit_fast and table_driven in ns/byte, and the cost
+of gen_table, for widths 8/16/32/64 with reflected and non-reflected parameters.
+The native presets are disabled, so only the Python implementation is measured.
+
+Only the standard library is needed:
+
+    python benchmarks/bench_crc.py --save-baseline   # record a baseline
+    python benchmarks/bench_crc.py                   # compare against it
+
+The run fails (exit status 1) when a result is slower than the baseline by
+more than --threshold, or when the algorithms disagree. Baselines are machine
+specific, so record one on the machine that runs the comparison.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from crc_algorithms import Crc
+
+DEFAULT_BASELINE = os.path.join(HERE, "crc_baseline.json")
+DEFAULT_SIZES = [16, 256, 4096, 65536, 1048576]
+ALGORITHMS = ["bit_by_bit", "bit_by_bit_fast", "table_driven"]
+
+# width: (poly, init/xor value)
+POLYS = {
+    8: (0x07, 0xFF),
+    16: (0x8005, 0xFFFF),
+    32: (0x04C11DB7, 0xFFFFFFFF),
+    64: (0x42F0E1EBA9EA3693, 0xFFFFFFFFFFFFFFFF),
+}
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+
+def crc_configs():
+    for width in sorted(POLYS):
+        poly, xor = POLYS[width]
+        for reflected in (False, True):
+            name = "w{}/{}".format(width, "reflected" if reflected else "normal")
+            crc = Crc(
+                width=width,
+                poly=poly,
+                reflect_in=reflected,
+                xor_in=xor,
+                reflect_out=reflected,
+                xor_out=xor,
+                native=False,
+            )
+            yield name, crc
+
+
+def best_time(func, arg, min_time):
+    """
+    Returns the fastest of repeated calls, repeating until min_time has passed.
+    """
+    best = None
+    total = 0.0
+    while total < min_time or best is None:
+        start = timer()
+        func(arg)
+        elapsed = timer() - start
+        total += elapsed
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run(sizes, min_time):
+    rand = random.Random(0)
+    data = "".join(chr(rand.randrange(256)) for _ in range(max(sizes)))
+    results = {}
+    mismatches = []
+    for name, crc in crc_configs():
+        check = data[:sizes[0]]
+        values = [getattr(crc, algorithm)(check) for algorithm in ALGORITHMS]
+        if len(set(values)) != 1:
+            mismatches.append(name)
+
+        key = "gen_table/{}".format(name)
+        results[key] = best_time(lambda _: crc.gen_table(), None, min_time) * 1e9
+        print("{:<40} {:>14.0f} ns".format(key, results[key]))
+
+        for algorithm in ALGORITHMS:
+            func = getattr(crc, algorithm)
+            for size in sizes:
+                key = "{}/{}/{}".format(algorithm, name, size)
+                results[key] = best_time(func, data[:size], min_time) * 1e9 / size
+                print("{:<40} {:>14.1f} ns/byte".format(key, results[key]))
+    return results, mismatches
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        ratio = results[key] / baseline[key]
+        if ratio > 1 + threshold:
+            regressions.append((key, baseline[key], results[key], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(size) for size in s.split(",")],
+        default=DEFAULT_SIZES,
+        help="comma separated input sizes in bytes",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimum seconds to repeat each measurement for",
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown relative to the baseline, e.g. 0.25 for 25%%",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="write the results to the baseline file instead of comparing",
+    )
+    args = parser.parse_args()
+
+    results, mismatches = run(sorted(args.sizes), args.min_time)
+    for name in mismatches:
+        print("FAIL: algorithms disagree for {}".format(name))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("Saved baseline to {}".format(args.baseline))
+        return 1 if mismatches else 0
+
+    if not os.path.isfile(args.baseline):
+        print("No baseline at {}, use --save-baseline".format(args.baseline))
+        return 1 if mismatches else 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for key, before, after, ratio in regressions:
+        print(
+            "REGRESSION: {} {:.1f} -> {:.1f} ({:+.0%})".format(
+                key, before, after, ratio - 1
+            )
+        )
+    if not regressions:
+        print("No regressions beyond {:.0%}".format(args.threshold))
+    return 1 if mismatches or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
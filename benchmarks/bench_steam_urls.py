@@ -0,0 +1,217 @@
+"""
+Benchmark and regression check for the rungameid computation in nonsteam.py.
+
+Compares steam_shortcut_ids(), which computes the ids of all shortcuts in one
+batch, with the per-item loop it replaced (a new Crc and a bit by bit CRC of
+exe + appname for every shortcut) and with a batch that hashes exe + appname in
+full for every shortcut, without reusing the CRC of the exe. Everything is
+measured in us/shortcut, with the native CRC-32 and with native=False, for:
+
+  pc        1k, 10k and 100k games, each with its own exe
+  emulated  20k ROMs spread over six emulators, which share their exe
+
+nonsteam.py is imported with tests/playnite_stubs.py, so this needs Python 2.7:
+
+    python2.7 benchmarks/bench_steam_urls.py --save-baseline   # record a baseline
+    python2.7 benchmarks/bench_steam_urls.py                   # compare against it
+
+The run fails (exit status 1) when a result is slower than the baseline by
+more than --threshold, or when the batch and the per-item loop disagree.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "tests"))
+
+from bench_crc import best_time, compare
+from playnite_stubs import import_nonsteam
+
+nonsteam = import_nonsteam()
+
+DEFAULT_BASELINE = os.path.join(HERE, "steam_urls_baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_ROMS = 20000
+
+EMULATORS = ["RetroArch", "Dolphin", "PCSX2", "Cemu", "RPCS3", "DuckStation"]
+
+
+def pc_library(size):
+    """
+    Returns shortcuts for size games, each with its own exe.
+    """
+    return [
+        {
+            "exe": u'"C:\\Games\\Game {0}\\Bin\\game{0}.exe"'.format(i),
+            "appname": u"Game number {}".format(i),
+        }
+        for i in range(size)
+    ]
+
+
+def emulated_library(size):
+    """
+    Returns shortcuts for size ROMs, spread randomly over EMULATORS.
+    """
+    rand = random.Random(0)
+    exes = [u'"C:\\Emulators\\{0}\\{0}.exe"'.format(name) for name in EMULATORS]
+    return [
+        {"exe": rand.choice(exes), "appname": u"ROM title number {} (USA) [!]".format(i)}
+        for i in range(size)
+    ]
+
+
+def shortcut_crc(native):
+    return nonsteam.Crc(
+        width=32,
+        poly=0x04C11DB7,
+        reflect_in=True,
+        xor_in=0xFFFFFFFF,
+        reflect_out=True,
+        xor_out=0xFFFFFFFF,
+        native=native,
+    )
+
+
+def per_item(shortcuts, native):
+    """
+    The rungameid URLs the way they were computed before steam_shortcut_ids().
+    """
+    urls = []
+    for shortcut in shortcuts:
+        algorithm = shortcut_crc(native)
+        input_string = shortcut["exe"].encode("utf-8") + shortcut["appname"].encode(
+            "utf-8"
+        )
+        urls.append(nonsteam.steam_rungameid_URL(algorithm.bit_by_bit(input_string)))
+    return urls
+
+
+def full_hash(shortcuts, native):
+    """
+    A batch sharing one Crc, but hashing exe + appname in full every time.
+    """
+    algorithm = shortcut_crc(native)
+    return [
+        nonsteam.steam_rungameid_URL(
+            algorithm.table_driven(
+                shortcut["exe"].encode("utf-8") + shortcut["appname"].encode("utf-8")
+            )
+        )
+        for shortcut in shortcuts
+    ]
+
+
+def batch(shortcuts, native):
+    steam_shortcut_crc = nonsteam.steam_shortcut_crc
+    nonsteam.steam_shortcut_crc = lambda: shortcut_crc(native)
+    try:
+        return [
+            nonsteam.steam_rungameid_URL(shortcut_id)
+            for shortcut_id in nonsteam.steam_shortcut_ids(shortcuts)
+        ]
+    finally:
+        nonsteam.steam_shortcut_crc = steam_shortcut_crc
+
+
+def run(libraries, min_time):
+    results = {}
+    mismatches = []
+    for library_name, library, sizes in libraries:
+        for size in sizes:
+            shortcuts = library(size)
+            for native in (True, False):
+                mode = "native" if native else "python"
+                check = per_item(shortcuts[:1000], native)
+                if not (
+                    check
+                    == full_hash(shortcuts[:1000], native)
+                    == batch(shortcuts[:1000], native)
+                ):
+                    mismatches.append("{}/{}/{}".format(library_name, mode, size))
+                for name, func in (
+                    ("per_item", per_item),
+                    ("full_hash", full_hash),
+                    ("batch", batch),
+                ):
+                    key = "{}/{}/{}/{}".format(name, library_name, mode, size)
+                    elapsed = best_time(lambda s: func(s, native), shortcuts, min_time)
+                    results[key] = elapsed * 1e6 / size
+                    print("{:<40} {:>10.2f} us/shortcut".format(key, results[key]))
+    return results, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(size) for size in s.split(",")],
+        default=DEFAULT_SIZES,
+        help="comma separated numbers of shortcuts in the pc library",
+    )
+    parser.add_argument(
+        "--roms",
+        type=int,
+        default=DEFAULT_ROMS,
+        help="number of ROMs in the emulated library",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimum seconds to repeat each measurement for",
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown relative to the baseline, e.g. 0.25 for 25%%",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="write the results to the baseline file instead of comparing",
+    )
+    args = parser.parse_args()
+
+    libraries = [
+        ("pc", pc_library, sorted(args.sizes)),
+        ("emulated", emulated_library, [args.roms]),
+    ]
+    results, mismatches = run(libraries, args.min_time)
+    for name in mismatches:
+        print("FAIL: batch and per-item ids disagree for {}".format(name))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("Saved baseline to {}".format(args.baseline))
+        return 1 if mismatches else 0
+
+    if not os.path.isfile(args.baseline):
+        print("No baseline at {}, use --save-baseline".format(args.baseline))
+        return 1 if mismatches else 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for key, before, after, ratio in regressions:
+        print(
+            "REGRESSION: {} {:.2f} -> {:.2f} ({:+.0%})".format(
+                key, before, after, ratio - 1
+            )
+        )
+    if not regressions:
+        print("No regressions beyond {:.0%}".format(args.threshold))
+    return 1 if mismatches or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
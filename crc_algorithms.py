@@ -28,6 +28,15 @@ is a good place to start from.
 
 The algorithms Bit by Bit, Bit by Bit Fast and Table-Driven are implemented.
 
+Well-known parameter sets (see NATIVE_PRESETS) are recognised when a Crc object
+is constructed, and all three algorithms are then computed by the native
+routines of the binascii module instead.  Pass native = False to the
+constructor to always use the Python implementation.
+
+Crc.new() returns a CrcState object which computes a CRC incrementally with
+update(), copy() and digest(), and Crc.combine() computes the CRC of two
+concatenated messages from their CRC values.
+
 This module can also be used as a library from within Python.
 
 Examples
@@ -43,8 +52,54 @@ This is an example use of the different algorithms:
 >>> print("0x%x" % crc.bit_by_bit("123456789"))
 >>> print("0x%x" % crc.bit_by_bit_fast("123456789"))
 >>> print("0x%x" % crc.table_driven("123456789"))
+>>>
+>>> state = crc.new("12345")
+>>> state.update("6789")
+>>> print("0x%x" % state.digest())
+>>> print("0x%x" % crc.combine(crc.table_driven("12345"), crc.table_driven("6789"), 4))
 """
 
+import binascii
+
+
+# Native presets
+###############################################################################
+def _crc32(in_str, crc):
+    return binascii.crc32(in_str, crc) & 0xffffffff
+
+def _jamcrc(in_str, crc):
+    return _crc32(in_str, crc ^ 0xffffffff) ^ 0xffffffff
+
+def _crc_hqx(in_str, crc):
+    return binascii.crc_hqx(in_str, crc)
+
+def _crc_hqx_xor_out(in_str, crc):
+    return binascii.crc_hqx(in_str, crc ^ 0xffff) ^ 0xffff
+
+
+# Maps (width, poly, reflect_in, xor_in, reflect_out, xor_out) to the tuple
+# (name, function, init).  function(in_str, crc) continues the CRC value crc
+# with in_str, and init is the CRC value of the empty string.
+NATIVE_PRESETS = {}
+
+
+# function register_native_preset
+###############################################################################
+def register_native_preset(name, width, poly, reflect_in, xor_in, reflect_out, xor_out, function, init):
+    """
+    Register a native routine for a CRC parameter set.
+    """
+    NATIVE_PRESETS[(width, poly, bool(reflect_in), xor_in, bool(reflect_out), xor_out)] = (name, function, init)
+
+
+register_native_preset("CRC-32",             32, 0x04c11db7, True,  0xffffffff, True,  0xffffffff, _crc32,           0x00000000)
+register_native_preset("JAMCRC",             32, 0x04c11db7, True,  0xffffffff, True,  0x00000000, _jamcrc,          0xffffffff)
+register_native_preset("CRC-16/XMODEM",      16, 0x1021,     False, 0x0000,     False, 0x0000,     _crc_hqx,         0x0000)
+register_native_preset("CRC-16/CCITT-FALSE", 16, 0x1021,     False, 0xffff,     False, 0x0000,     _crc_hqx,         0xffff)
+register_native_preset("CRC-16/GENIBUS",     16, 0x1021,     False, 0xffff,     False, 0xffff,     _crc_hqx_xor_out, 0x0000)
+register_native_preset("CRC-16/GSM",         16, 0x1021,     False, 0x0000,     False, 0xffff,     _crc_hqx_xor_out, 0xffff)
+
+
 # Class Crc
 ###############################################################################
 class Crc(object):
@@ -54,7 +109,7 @@ class Crc(object):
 
     # Class constructor
     ###############################################################################
-    def __init__(self, width, poly, reflect_in, xor_in, reflect_out, xor_out, table_idx_width = None):
+    def __init__(self, width, poly, reflect_in, xor_in, reflect_out, xor_out, table_idx_width = None, native = True):
         """The Crc constructor.
 
         The parameters are as follows:
@@ -64,6 +119,8 @@ class Crc(object):
             xor_in
             reflect_out
             xor_out
+            table_idx_width
+            native: use a native routine if the parameters match a preset
         """
         self.Width          = width
         self.Poly           = poly
@@ -87,6 +144,13 @@ class Crc(object):
             self.CrcShift = 8 - self.Width
         else:
             self.CrcShift = 0
+        self.Table = None
+
+        self.NativeName, self.Native, self.NativeInit = None, None, None
+        if native:
+            key = (self.Width, self.Poly, bool(self.ReflectIn), self.XorIn, bool(self.ReflectOut), self.XorOut)
+            if key in NATIVE_PRESETS:
+                self.NativeName, self.Native, self.NativeInit = NATIVE_PRESETS[key]
 
 
     # function __get_nondirect_init
@@ -127,6 +191,9 @@ class Crc(object):
         by bit over the augmented input message and returns the calculated CRC
         value at the end.
         """
+        if self.Native is not None:
+            return self.Native(in_str, self.NativeInit)
+
         register = self.NonDirectInit
         for c in in_str:
             octet = ord(c)
@@ -157,6 +224,9 @@ class Crc(object):
         does not need to loop over the augmented bits, i.e. the Width 0-bits
         wich are appended to the input message in the bit-by-bit algorithm.
         """
+        if self.Native is not None:
+            return self.Native(in_str, self.NativeInit)
+
         register = self.DirectInit
         for c in in_str:
             octet = ord(c)
@@ -206,11 +276,27 @@ class Crc(object):
     ###############################################################################
     def table_driven(self, in_str):
         """
-        The Standard table_driven CRC algorithm.
+        The Standard table_driven CRC algorithm.  The table is generated on the
+        first call and reused afterwards.
         """
-        tbl = self.gen_table()
+        if self.Native is not None:
+            return self.Native(in_str, self.NativeInit)
+
+        return self.__table_driven(self.DirectInit, in_str)
+
 
-        register = self.DirectInit << self.CrcShift
+    # function __table_driven
+    ###############################################################################
+    def __table_driven(self, register, in_str):
+        """
+        Run the table_driven CRC algorithm over in_str, starting with the direct
+        register value register.
+        """
+        if self.Table is None:
+            self.Table = self.gen_table()
+        tbl = self.Table
+
+        register = register << self.CrcShift
         if not self.ReflectIn:
             for c in in_str:
                 tblidx = ((register >> (self.Width - self.TableIdxWidth + self.CrcShift)) ^ ord(c)) & 0xff
@@ -223,7 +309,163 @@ class Crc(object):
                 register = ((register >> self.TableIdxWidth) ^ tbl[tblidx]) & (self.Mask << self.CrcShift)
             register = self.reflect(register, self.Width + self.CrcShift) & self.Mask
 
+        return self.__get_crc(register)
+
+
+    # function __get_crc
+    ###############################################################################
+    def __get_crc(self, register):
+        """
+        return the CRC value of a direct register value.
+        """
         if self.ReflectOut:
             register = self.reflect(register, self.Width)
         return register ^ self.XorOut
 
+
+    # function __get_register
+    ###############################################################################
+    def __get_register(self, crc):
+        """
+        return the direct register value of a CRC value, i.e. the inverse of
+        __get_crc.
+        """
+        register = crc ^ self.XorOut
+        if self.ReflectOut:
+            register = self.reflect(register, self.Width)
+        return register
+
+
+    # function update
+    ###############################################################################
+    def update(self, crc, in_str):
+        """
+        Continue the calculation of crc, the CRC value of a message, with in_str
+        and return the CRC value of the message followed by in_str.
+        """
+        if self.Native is not None:
+            return self.Native(in_str, crc)
+
+        return self.__table_driven(self.__get_register(crc), in_str)
+
+
+    # function new
+    ###############################################################################
+    def new(self, in_str = ""):
+        """
+        return a new CrcState object, optionally initialised with in_str.
+        """
+        state = CrcState(self, self.table_driven(""))
+        state.update(in_str)
+        return state
+
+
+    # function combine
+    ###############################################################################
+    def combine(self, crc1, crc2, len2):
+        """
+        return the CRC value of the concatenation of two messages, given the CRC
+        value crc1 of the first message, and the CRC value crc2 and the length
+        len2 of the second message.  Shifting the first register past the second
+        message takes O(log(len2)) matrix operations, as in zlib's crc32_combine.
+        """
+        register = self.__shift_zeros(self.__get_register(crc1) ^ self.DirectInit, len2)
+        return self.__get_crc(register ^ self.__get_register(crc2))
+
+
+    # function __shift_zeros
+    ###############################################################################
+    def __shift_zeros(self, register, length):
+        """
+        return the direct register value after feeding length zero bytes into
+        register.
+        """
+        # Operator for one zero bit; column i is the image of bit i
+        mat = [(1 << (i + 1)) & self.Mask for i in range(self.Width)]
+        mat[self.Width - 1] = self.Poly & self.Mask
+        # Operator for one zero byte
+        for i in range(3):
+            mat = self.__gf2_matrix_square(mat)
+        while length:
+            if length & 1:
+                register = self.__gf2_matrix_times(mat, register)
+            length >>= 1
+            if length:
+                mat = self.__gf2_matrix_square(mat)
+        return register
+
+
+    # function __gf2_matrix_times
+    ###############################################################################
+    def __gf2_matrix_times(self, mat, vec):
+        """
+        multiply a GF(2) matrix, given as a list of columns, with a vector.
+        """
+        result = 0
+        i = 0
+        while vec:
+            if vec & 0x01:
+                result ^= mat[i]
+            vec >>= 1
+            i += 1
+        return result
+
+
+    # function __gf2_matrix_square
+    ###############################################################################
+    def __gf2_matrix_square(self, mat):
+        """
+        square a GF(2) matrix.
+        """
+        return [self.__gf2_matrix_times(mat, col) for col in mat]
+
+
+# Class CrcState
+###############################################################################
+class CrcState(object):
+    """
+    The state of an incremental CRC calculation, see Crc.new().
+    """
+
+    # Class constructor
+    ###############################################################################
+    def __init__(self, crc, value, length = 0):
+        """The CrcState constructor.
+
+        The parameters are as follows:
+            crc: the Crc object
+            value: the CRC value of the data processed so far
+            length: the length of the data processed so far
+        """
+        self.Crc    = crc
+        self.Value  = value
+        self.Length = length
+
+
+    # function update
+    ###############################################################################
+    def update(self, in_str):
+        """
+        process in_str.
+        """
+        self.Value = self.Crc.update(self.Value, in_str)
+        self.Length += len(in_str)
+
+
+    # function copy
+    ###############################################################################
+    def copy(self):
+        """
+        return an independent copy of this state, e.g. to reuse the state of a
+        common prefix for several messages.
+        """
+        return CrcState(self.Crc, self.Value, self.Length)
+
+
+    # function digest
+    ###############################################################################
+    def digest(self):
+        """
+        return the CRC value of the data processed so far.
+        """
+        return self.Value
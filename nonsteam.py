@@ -16,35 +16,70 @@ SHORTCUT_DEFAULTS = {
 }
 
 
+# Write every game that was skipped or warned about to nonsteam_details.log in
+# this extension's data folder. playnite.log only lists the first few games.
+WRITE_DETAILS_LOG = False
+
+
 # Do not edit anything below this line
 
 
 import struct
+import binascii
+import hashlib
 import shutil
-from collections import Counter
+from collections import Counter, OrderedDict
+import codecs
+import errno
 import traceback
 from os.path import isdir, isfile, join
 import os
+import json
+import threading
+import time
+from Queue import Queue, Empty
+from StringIO import StringIO
 
 import clr
 import System
 import System.Guid as Guid
 from System.Collections.ObjectModel import ObservableCollection
-from System.IO import FileInfo, Path
+from System.IO import File, FileInfo, Path
 from System import Array, Object
 from System.Windows import MessageBoxButton, MessageBoxImage, MessageBoxResult
-from Playnite.SDK.Plugins import ScriptGameMenuItem
+from Playnite.SDK.Plugins import ScriptGameMenuItem, ScriptMainMenuItem
 
 clr.AddReference("System.Core")
 clr.ImportExtensions(System.Linq)
 
 STEAM_PLUGIN_GUID = Guid.Parse("CB91DFC9-B977-43BF-8E70-55F46E410FAB")
 
+# Number of games processed at once when syncing the whole library
+SYNC_CHUNK_SIZE = 500
+
 def get_gamemenu_items(menu_args):
     menu_item = ScriptGameMenuItem()
     menu_item.Description = "Create non-Steam shortcuts"
     menu_item.FunctionName = "non_steam_shortcuts"
     yield menu_item
+    menu_item = ScriptGameMenuItem()
+    menu_item.Description = "Preview non-Steam shortcut changes"
+    menu_item.FunctionName = "non_steam_shortcuts_preview"
+    yield menu_item
+
+def get_mainmenu_items(menu_args):
+    menu_item = ScriptMainMenuItem()
+    menu_item.Description = "Create non-Steam shortcuts for all eligible games"
+    menu_item.FunctionName = "non_steam_shortcuts_all"
+    yield menu_item
+    menu_item = ScriptMainMenuItem()
+    menu_item.Description = "Preview non-Steam shortcut changes for all eligible games"
+    menu_item.FunctionName = "non_steam_shortcuts_all_preview"
+    yield menu_item
+
+def get_logger():
+    # Methods can't use __logger directly, the name would be mangled
+    return __logger
 
 def validate_steam_userdata_dir(folder):
     return folder and isdir(join(folder, "config"))
@@ -80,51 +115,285 @@ def get_steam_userdata_dir():
 
 # Parse shortcuts.vdf
 # Steam matches keys case insensitively, so lowercase all keys to be case insensitive
+# The whole file is parsed from memory, every read is bounds checked and damaged
+# entries are skipped by resuming at the next entry boundary. Entries nest at
+# most one object deep (tags), which keeps each attempt short and the whole
+# scan linear in the size of the file.
+
+SHORTCUTS_HEADER = "\x00shortcuts\x00"
+SHORTCUT_MAX_DEPTH = 2
+SHORTCUT_STRING_KEYS = ("appname", "exe", "startdir", "icon", "launchoptions")
+# Steam allows several shortcuts with the same appname. Only the first one is
+# keyed by its appname, the others are kept under keys containing this
+# separator, which never collide with the name of a game.
+DUPLICATE_KEY_SEPARATOR = "\x01"
+
 
+def recover_string(data, pos):
+    end = data.find("\x00", pos)
+    if end < 0:
+        raise ValueError("Unterminated string at offset {}".format(pos))
+    return data[pos:end].decode("utf-8"), end + 1
 
-def parse_object(stream):
-    k = parse_string(stream).lower()
+
+def recover_object(data, pos, depth):
     # Read key value pairs until a \x08 byte is reached
-    v = dict(iter(lambda: parse(stream), None))
-    return k, v
+    values = {}
+    while True:
+        data_type = data[pos : pos + 1]
+        if data_type == "\x08":
+            return values, pos + 1
+        if not data_type:
+            raise ValueError("Unexpected end of file at offset {}".format(pos))
+        if data_type not in ("\x00", "\x01", "\x02"):
+            raise ValueError(
+                "Unknown type {!r} at offset {}".format(data_type, pos)
+            )
+        k, pos = recover_string(data, pos + 1)
+        if data_type == "\x00":
+            if depth >= SHORTCUT_MAX_DEPTH:
+                raise ValueError("Object nested too deeply at offset {}".format(pos))
+            v, pos = recover_object(data, pos, depth + 1)
+        elif data_type == "\x01":
+            v, pos = recover_string(data, pos)
+        else:
+            if pos + 4 > len(data):
+                raise ValueError("Unexpected end of file at offset {}".format(pos))
+            (v,) = struct.unpack("i", data[pos : pos + 4])
+            pos += 4
+        values[k.lower()] = v
+
+
+def recover_shortcut(data, pos):
+    if data[pos : pos + 1] != "\x00":
+        raise ValueError("Expected a shortcut at offset {}".format(pos))
+    k, pos = recover_string(data, pos + 1)
+    shortcut, pos = recover_object(data, pos, 1)
+    for k in SHORTCUT_STRING_KEYS:
+        if k in shortcut and not isinstance(shortcut[k], basestring):
+            raise ValueError("Shortcut has an invalid {}".format(k))
+    if "appname" not in shortcut:
+        raise ValueError("Shortcut has no appname")
+    return shortcut, pos
+
+
+def next_shortcut_offset(data, pos):
+    # Shortcuts start right after the \x08 ending the previous shortcut
+    i = data.find("\x08\x00", pos)
+    if i >= 0:
+        return i + 1
+    # Otherwise resume at the end of the shortcuts object, if it is intact
+    if data.endswith("\x08\x08") and pos <= len(data) - 2:
+        return len(data) - 2
+    return len(data)
+
+
+def recover_shortcuts(stream):
+    """
+    Parses shortcuts.vdf, skipping damaged data instead of failing.
 
+    Returns the intact shortcuts, and a list of (offset, error) tuples
+    describing the damage. The list is empty if the file is intact.
 
-def parse_int_value(stream):
-    k = parse_string(stream).lower()
-    (v,) = struct.unpack("i", stream.read(4))
-    return k, v
+    Shortcuts sharing an appname with an earlier shortcut are not damage, they
+    are kept and listed by duplicate_shortcuts().
+    """
+    data = stream.read()
+    shortcuts = {}
+    damage = []
+
+    pos = len(SHORTCUTS_HEADER)
+    if data[:pos].lower() != SHORTCUTS_HEADER:
+        damage.append((0, "Invalid shortcuts header"))
+
+    while True:
+        if pos >= len(data):
+            damage.append((len(data), "Unexpected end of file"))
+            break
+        if pos == len(data) - 2 and data.endswith("\x08\x08"):
+            break
+        try:
+            shortcut, end = recover_shortcut(data, pos)
+        except ValueError as e:
+            damage.append((pos, str(e)))
+            pos = next_shortcut_offset(data, pos + 1)
+            continue
+        key = shortcut["appname"]
+        if key in shortcuts:
+            key += DUPLICATE_KEY_SEPARATOR + str(pos)
+        shortcuts[key] = shortcut
+        pos = end
 
+    return shortcuts, damage
 
-def parse_string_value(stream):
-    k = parse_string(stream).lower()
-    v = parse_string(stream)
-    return k, v
 
+def duplicate_shortcuts(shortcuts):
+    """
+    Returns the sorted appnames of the shortcuts kept as duplicates by
+    recover_shortcuts(), once per duplicate.
 
-def parse_string(stream):
-    # Strings are null terminated
-    return "".join(iter(lambda: stream.read(1), "\x00")).decode("utf-8")
+    Playnite only updates the first shortcut with a given appname, the
+    duplicates are written back unchanged.
+    """
+    return sorted(
+        shortcut["appname"]
+        for k, shortcut in shortcuts.iteritems()
+        if DUPLICATE_KEY_SEPARATOR in k
+    )
 
 
-parse_types = {
-    "\x00": parse_object,
-    "\x01": parse_string_value,
-    "\x02": parse_int_value,
-    "\x08": lambda stream: None,
-}
+# Concurrent writers
+# Steam, other shortcut managers and other Playnite instances may rewrite
+# shortcuts.vdf while this extension runs. Writes from this extension are
+# serialized by a lock file, and the file is checked for changes since it was
+# loaded before it is written.
+
+# Seconds to wait for the lock, and after which a lock is considered stale
+SHORTCUTS_LOCK_TIMEOUT = 30
+SHORTCUTS_LOCK_STALE = 120
+
+
+def load_shortcuts(shortcuts_vdf):
+    """
+    Reads shortcuts.vdf with recover_shortcuts().
+
+    Also returns the (size, mtime, hash) signature of the file, used to detect
+    concurrent writes.
+    """
+    stat = os.stat(shortcuts_vdf)
+    with open(shortcuts_vdf, "rb") as f:
+        data = f.read()
+    shortcuts, damage = recover_shortcuts(StringIO(data))
+    signature = (stat.st_size, stat.st_mtime, hashlib.sha1(data).hexdigest())
+    return shortcuts, damage, signature
+
+
+class ShortcutsLock(object):
+    """
+    Advisory lock on shortcuts.vdf, held while it is checked and written.
+
+    The lock is a file created exclusively next to shortcuts.vdf, holding a
+    token unique to its owner. Locks left behind by a crashed run are broken
+    after SHORTCUTS_LOCK_STALE seconds.
+
+    A lock file is only removed after renaming it to a name unique to this
+    ShortcutsLock and checking the token inside, so a lock that another
+    process created in the meantime is never removed.
+    """
+
+    def __init__(self, shortcuts_vdf):
+        self.path = shortcuts_vdf + ".lock"
+        self.token = "{} {}".format(os.getpid(), binascii.hexlify(os.urandom(8)))
+
+    def __enter__(self):
+        deadline = time.time() + SHORTCUTS_LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except (IOError, OSError) as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            else:
+                os.write(fd, self.token)
+                os.close(fd)
+                return self
+            self.break_if_stale()
+            if time.time() > deadline:
+                raise IOError("Timed out waiting for lock " + self.path)
+            time.sleep(0.05)
+
+    def __exit__(self, *exc_info):
+        if not self.remove_if_owned_by(self.token):
+            get_logger().Warn(
+                "Non-Steam: Lock {} was broken by another process".format(self.path)
+            )
+
+    def read_owner(self, path):
+        with open(path, "r") as f:
+            return f.read()
+
+    def break_if_stale(self):
+        """
+        Removes the lock file if it is older than SHORTCUTS_LOCK_STALE.
+        """
+        try:
+            owner = self.read_owner(self.path)
+            if time.time() - os.path.getmtime(self.path) <= SHORTCUTS_LOCK_STALE:
+                return
+        except (IOError, OSError):
+            # The lock was released in the meantime, or is not a readable file
+            return
+        if self.remove_if_owned_by(owner):
+            get_logger().Warn(
+                "Non-Steam: Broke stale lock {} held by {}".format(self.path, owner)
+            )
 
+    def remove_if_owned_by(self, owner):
+        """
+        Removes the lock file if it holds the given token.
 
-def parse(stream):
-    # Read a per type one byte header, then parse using the correct type
-    data_type = stream.read(1)
-    return parse_types[data_type](stream)
+        Returns False if there is no lock, or if it belongs to someone else.
+        """
+        moved = "{}.{}".format(self.path, self.token.replace(" ", "."))
+        try:
+            os.rename(self.path, moved)
+        except (IOError, OSError):
+            return False
+        try:
+            moved_owner = self.read_owner(moved)
+        except (IOError, OSError):
+            moved_owner = None
+        if moved_owner == owner:
+            os.remove(moved)
+            return True
+        # Someone replaced the lock between our check and the rename
+        try:
+            os.rename(moved, self.path)
+        except (IOError, OSError):
+            # Yet another lock was created in the meantime, which now wins
+            os.remove(moved)
+        return False
 
 
-def parse_shortcuts(stream):
-    shortcuts = parse(stream)[1].values()
-    if Counter(s["appname"] for s in shortcuts).most_common()[0][1] > 1:
-        raise "Duplicate appnames in Steam shortcuts"
-    return {s["appname"]: s for s in shortcuts}
+def save_shortcuts(shortcuts_vdf, plan, signature):
+    """
+    Writes the planned shortcuts to shortcuts.vdf, with ShortcutsLock held.
+
+    If shortcuts.vdf was written by someone else since it was loaded with the
+    given signature, only the new file is read and the plan is merged into it,
+    instead of overwriting it. Returns True if the plan was merged.
+    """
+    shortcuts = plan.shortcuts
+    merged = False
+    if isfile(shortcuts_vdf):
+        stat = os.stat(shortcuts_vdf)
+        if signature is None or (stat.st_size, stat.st_mtime) != signature[:2]:
+            with open(shortcuts_vdf, "rb") as f:
+                data = f.read()
+            if signature is None or hashlib.sha1(data).hexdigest() != signature[2]:
+                newer_shortcuts, damage = recover_shortcuts(StringIO(data))
+                for offset, error in damage:
+                    __logger.Warn(
+                        "Non-Steam: shortcuts.vdf is damaged at offset {}: {}".format(
+                            offset, error
+                        )
+                    )
+                shortcuts = plan.merge_into(newer_shortcuts)
+                merged = True
+    # Steam and other programs read shortcuts.vdf without the lock, so they
+    # must never see a partly written file
+    with open(shortcuts_vdf + ".tmp", "wb") as f:
+        dump_shortcuts(f, shortcuts)
+    replace_file(shortcuts_vdf + ".tmp", shortcuts_vdf)
+    return merged
+
+
+def replace_file(source, target):
+    try:
+        os.rename(source, target)
+    except OSError:
+        # Windows can't rename over an existing file
+        File.Replace(source, target, None)
 
 
 # Dump shortcuts.vdf
@@ -137,7 +406,7 @@ def dump_object_value(stream, k, values):
     for k, v in values.iteritems():
         if isinstance(v, dict):
             dump_object_value(stream, k, v)
-        elif isinstance(v, str):
+        elif isinstance(v, basestring):
             dump_string_value(stream, k, v)
         elif isinstance(v, int):
             dump_int_value(stream, k, v)
@@ -170,19 +439,12 @@ def dump_shortcuts(stream, shortcuts):
     stream.write("\x08")
 
 
-def steam_URL(shortcut):
-    # Comments by Scott Rice:
-    """
-    Calculates the filename for a given shortcut. This filename is a 64bit
-    integer, where the first 32bits are a CRC32 based off of the name and
-    target (with the added condition that the first bit is always high), and
-    the last 32bits are 0x02000000.
-    """
+def steam_shortcut_crc():
     # This will seem really strange (where I got all of these values), but I
     # got the xor_in and xor_out from disassembling the steamui library for
     # OSX. The reflect_in, reflect_out, and poly I figured out via trial and
     # error.
-    algorithm = Crc(
+    return Crc(
         width=32,
         poly=0x04C11DB7,
         reflect_in=True,
@@ -190,12 +452,177 @@ def steam_URL(shortcut):
         reflect_out=True,
         xor_out=0xFFFFFFFF,
     )
-    input_string = shortcut["exe"].encode("utf-8") + shortcut["appname"].encode("utf-8")
-    top_32 = algorithm.bit_by_bit(input_string) | 0x80000000
+
+
+def steam_shortcut_id(crc):
+    # The shortcut id also names the shortcut's images in config/grid
+    return crc | 0x80000000
+
+
+def steam_rungameid_URL(crc):
+    # Comments by Scott Rice:
+    """
+    Calculates the filename for a given shortcut. This filename is a 64bit
+    integer, where the first 32bits are a CRC32 based off of the name and
+    target (with the added condition that the first bit is always high), and
+    the last 32bits are 0x02000000.
+    """
+    top_32 = steam_shortcut_id(crc)
     full_64 = (top_32 << 32) | 0x02000000
     return "steam://rungameid/" + str(full_64)
 
 
+# Number of executables whose CRC state is kept by steam_shortcut_ids()
+EXE_CRC_CACHE_SIZE = 16
+
+
+def steam_shortcut_ids(shortcuts):
+    """
+    Calculates the shortcut ids (the CRCs for steam_rungameid_URL(), with the
+    high bit set) for a list of shortcuts at once.
+
+    Emulated games share the emulator's exe, so the CRC of an exe that was
+    seen before is kept in a small cache and continued with only the appname
+    of each shortcut. The first shortcut of an exe is hashed in full, which
+    keeps libraries where every game has its own exe as fast as without the
+    cache. The oldest exe is evicted when the cache is full; tracking recency
+    on every hit costs more than it saves.
+    """
+    algorithm = steam_shortcut_crc()
+    exe_crcs = OrderedDict()
+    seen_exes = set()
+    ids = []
+    for shortcut in shortcuts:
+        exe = shortcut["exe"]
+        appname = shortcut["appname"].encode("utf-8")
+        exe_crc = exe_crcs.get(exe)
+        if exe_crc is not None:
+            crc = algorithm.update(exe_crc, appname)
+        elif exe not in seen_exes:
+            seen_exes.add(exe)
+            crc = algorithm.table_driven(exe.encode("utf-8") + appname)
+        else:
+            if len(exe_crcs) >= EXE_CRC_CACHE_SIZE:
+                exe_crcs.popitem(last=False)
+            exe_crc = exe_crcs[exe] = algorithm.table_driven(exe.encode("utf-8"))
+            crc = algorithm.update(exe_crc, appname)
+        ids.append(steam_shortcut_id(crc))
+    return ids
+
+
+class ShortcutPlan(object):
+    """
+    The changes a run will make to shortcuts.vdf.
+
+    Planned shortcuts are compared to the existing shortcuts with ==, and only
+    the shortcuts that differ are compared field by field.
+    """
+
+    def __init__(self, steam_shortcuts, planned_shortcuts):
+        self.added = []
+        # appname: sorted list of changed fields
+        self.updated = {}
+        self.unchanged = []
+        for appname, shortcut in planned_shortcuts.iteritems():
+            existing = steam_shortcuts.get(appname)
+            if existing is None:
+                self.added.append(appname)
+            elif existing == shortcut:
+                self.unchanged.append(appname)
+            else:
+                self.updated[appname] = sorted(
+                    k
+                    for k in set(existing) | set(shortcut)
+                    if existing.get(k) != shortcut.get(k)
+                )
+        self.added.sort()
+        self.unchanged.sort()
+
+        self.planned = planned_shortcuts
+        self.shortcuts = dict(steam_shortcuts)
+        self.shortcuts.update(planned_shortcuts)
+
+    def has_changes(self):
+        return bool(self.added or self.updated)
+
+    def merge_into(self, shortcuts):
+        """
+        Applies the changes of this plan to a newer version of shortcuts.vdf.
+
+        This is a three-way merge with the shortcuts the plan was computed from
+        as the base: only the fields this plan changes are written, so other
+        shortcuts and fields keep their newer values.
+        """
+        merged = dict(shortcuts)
+        changes = [(appname, self.planned[appname].keys()) for appname in self.added]
+        changes += self.updated.items()
+        for appname, fields in changes:
+            shortcut = self.planned[appname]
+            # A shortcut removed in the meantime is recreated
+            merged_shortcut = dict(merged.get(appname, shortcut))
+            for k in fields:
+                if k in shortcut:
+                    merged_shortcut[k] = shortcut[k]
+                else:
+                    merged_shortcut.pop(k, None)
+            merged[appname] = merged_shortcut
+        return merged
+
+    def describe(self):
+        """
+        Describes the plan for the preview dialog.
+        """
+        if not self.has_changes():
+            return "No changes to non-Steam shortcuts ({} unchanged)".format(
+                len(self.unchanged)
+            )
+        added = self.added
+        if len(added) > 10:
+            added = added[:10] + ["[...]"]
+        updated = [
+            "{} ({})".format(appname, ", ".join(fields))
+            for appname, fields in sorted(self.updated.items())
+        ]
+        if len(updated) > 10:
+            updated = updated[:10] + ["[...]"]
+        message = "{} non-Steam shortcut(s) will be created, {} updated and {} are unchanged".format(
+            len(self.added), len(self.updated), len(self.unchanged)
+        )
+        if added:
+            message += "\n\nNew shortcuts:\n" + "\n".join(added)
+        if updated:
+            message += "\n\nUpdated shortcuts (changed fields):\n" + "\n".join(updated)
+        return message
+
+
+def update_play_actions(game, play_action, steam_url):
+    # Only run once, don't create duplicate OtherActions
+    if play_action == game.PlayAction:
+        old_action = game.PlayAction
+        steam_action = GameAction(
+            Name="Non-Steam Steam Shortcut",
+            Type=GameActionType.URL,
+            Path=steam_url,
+            IsHandledByPlugin=False,
+        )
+        game.PlayAction = steam_action
+        if not game.OtherActions:
+            game.OtherActions = ObservableCollection[GameAction]()
+        old_action.Name = "Launch without Steam"
+        game.OtherActions.Insert(0, old_action)
+    else:
+        # play_action is already an OtherAction
+        # Just make sure the URL is up to date on the main PlayAction
+        game.PlayAction.Path = steam_url
+
+
+def play_action_changes(game, play_action, steam_url):
+    """
+    Returns whether update_play_actions() would change the game.
+    """
+    return play_action == game.PlayAction or game.PlayAction.Path != steam_url
+
+
 def find_play_action(game):
     """
     Check if there is an existing OtherAction titled "Launch without Steam".
@@ -220,18 +647,368 @@ def emulator_expand_variables(profile, game):
     return method.Invoke(None, Array[Object]((profile, game,)))
 
 
-def open_playnite_log():
-    path = join(PlayniteApi.Paths.ConfigurationPath, "playnite.log")
-    os.startfile(path)
+class PathResolver(object):
+    """
+    Resolves and validates shortcut paths for a single run.
+
+    Emulated games share the emulator's exe and working directory, so path
+    normalization is memoized. Files are checked for existence by listing each
+    distinct parent directory once, instead of stat-ing every file.
+    """
+
+    def __init__(self):
+        self.exes = {}
+        self.listings = {}
+
+    def resolve_exe(self, exe, start_dir):
+        """
+        Returns the start dir (defaulting to the exe's directory) and the full
+        path of the exe.
+        """
+        key = (exe, start_dir)
+        if key not in self.exes:
+            if not start_dir:
+                start_dir = FileInfo(exe).Directory.FullName
+            self.exes[key] = (start_dir, Path.Combine(start_dir, exe))
+        return self.exes[key]
+
+    def exists(self, path):
+        directory, name = os.path.split(os.path.normpath(path))
+        key = os.path.normcase(directory)
+        if key not in self.listings:
+            try:
+                names = os.listdir(directory)
+            except (IOError, OSError):
+                names = []
+            self.listings[key] = set(os.path.normcase(n) for n in names)
+        return os.path.normcase(name) in self.listings[key]
+
+
+# Playnite image fields, and the suffix Steam uses for them in config/grid
+GRID_ARTWORK = (("CoverImage", "p"), ("BackgroundImage", "_hero"))
+
+# Number of threads copying artwork to config/grid
+GRID_COPY_THREADS = 4
+
+
+def grid_artwork(game, shortcut_id, paths):
+    """
+    Yields (source, grid filename) pairs for the game's images that exist.
+    """
+    for field, suffix in GRID_ARTWORK:
+        image = getattr(game, field)
+        if not image or image.lower().startswith(("http://", "https://")):
+            continue
+        source = PlayniteApi.Database.GetFullFilePath(image)
+        if paths.exists(source):
+            extension = os.path.splitext(source)[1].lower()
+            yield source, "{}{}{}".format(shortcut_id, suffix, extension)
+
+
+def file_hash(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), ""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+class GridArtworkSync(object):
+    """
+    Copies Playnite artwork into Steam's config/grid folder.
+
+    A manifest records the source path, size, mtime and content hash of every
+    image that was copied, so rerunning only stats the sources. An image is
+    only hashed if its source changed, and only copied if the content hash or
+    size of the existing grid image differs. Images are hard-linked where
+    possible, and copied by a pool of threads.
+
+    run() can be called once per batch of images, save_manifest() writes the
+    manifest after the last batch.
+    """
+
+    def __init__(self, grid_dir, manifest_path):
+        self.grid_dir = grid_dir
+        self.manifest_path = manifest_path
+        self.manifest = {}
+        if isfile(manifest_path):
+            try:
+                with open(manifest_path, "r") as f:
+                    self.manifest = json.load(f)
+            except ValueError:
+                get_logger().Warn("Non-Steam: Ignoring invalid grid manifest")
+        self.manifest_changed = False
+        self.lock = threading.Lock()
+        self.linked = 0
+        self.copied = 0
+        self.unchanged = 0
+        self.errors = []
+
+    def run(self, artwork):
+        if not artwork:
+            return
+        if not isdir(self.grid_dir):
+            os.makedirs(self.grid_dir)
+        queue = Queue()
+        for item in artwork:
+            queue.put(item)
+        workers = []
+        for i in range(min(GRID_COPY_THREADS, len(artwork))):
+            worker = threading.Thread(target=self.work, args=(queue,))
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+
+    def save_manifest(self):
+        if self.manifest_changed:
+            with open(self.manifest_path, "w") as f:
+                json.dump(self.manifest, f)
+            self.manifest_changed = False
+
+    def work(self, queue):
+        while True:
+            try:
+                source, filename = queue.get_nowait()
+            except Empty:
+                return
+            try:
+                self.sync(source, join(self.grid_dir, filename))
+            except Exception as e:
+                get_logger().Error(
+                    "Non-Steam: Error copying artwork {}: {}".format(source, e)
+                )
+                with self.lock:
+                    self.errors.append(source)
+
+    def sync(self, source, target):
+        stat = os.stat(source)
+        signature = [source, stat.st_size, int(stat.st_mtime)]
+        with self.lock:
+            entry = self.manifest.get(target)
+        target_size = os.path.getsize(target) if isfile(target) else None
+
+        # Neither the source nor the target changed since the last run
+        if entry and entry[:3] == signature and target_size == stat.st_size:
+            with self.lock:
+                self.unchanged += 1
+            return
+
+        source_hash = file_hash(source)
+        if target_size == stat.st_size and file_hash(target) == source_hash:
+            with self.lock:
+                self.manifest[target] = signature + [source_hash]
+                self.manifest_changed = True
+                self.unchanged += 1
+            return
+
+        if target_size is not None:
+            os.remove(target)
+        try:
+            os.link(source, target)
+            linked = True
+        except (AttributeError, OSError):
+            # os.link is missing on Windows, or source and target are on
+            # different volumes
+            shutil.copyfile(source, target)
+            linked = False
+        with self.lock:
+            self.manifest[target] = signature + [source_hash]
+            self.manifest_changed = True
+            if linked:
+                self.linked += 1
+            else:
+                self.copied += 1
+
+
+# Categories of games that were skipped or warned about:
+# (category, log level, log message, summary dialog heading)
+DIAGNOSTIC_CATEGORIES = (
+    (
+        "steam_native",
+        "Warn",
+        "Games are already Steam games",
+        "Skipped {} native Steam game(s):",
+    ),
+    (
+        "no_action",
+        "Error",
+        "Games have no PlayAction",
+        "Skipped {} game(s) without any PlayAction set (not installed?):",
+    ),
+    (
+        "bad_emulator",
+        "Error",
+        "Emulated games have bad emulator profiles",
+        "Skipped {} emulated game(s) with bad emulator profiles:",
+    ),
+    (
+        "url",
+        "Warn",
+        "Games have a URL as PlayAction",
+        "Warning: Some games had URL launch actions. (Typically managed by a library plugin.) "
+        "You may wish to update their actions and recreate non-Steam shortcuts. "
+        "Steam will still launch these games, but the Steam overlay will not function."
+        "\n\nThe following {} game(s) had URL launch actions:",
+    ),
+    (
+        "missing_exe",
+        "Warn",
+        "Game executables do not exist",
+        "Warning: The executables of the following {} game(s) do not exist:",
+    ),
+    (
+        "missing_icon",
+        "Warn",
+        "Game icons do not exist",
+        "Warning: The icons of the following {} game(s) do not exist:",
+    ),
+)
+
+# Number of game names kept per category for playnite.log and the summary
+DIAGNOSTICS_SAMPLE_SIZE = 10
+
+
+class Diagnostics(object):
+    """
+    Collects the games that were skipped or warned about during a run.
+
+    Each category keeps a count and the first few game names, and is logged as
+    a single record by log(). With details, every game is also kept for
+    write_details().
+    """
+
+    def __init__(self, details=False):
+        self.counts = Counter()
+        self.samples = {}
+        self.details = {} if details else None
+
+    def add(self, category, name, detail=""):
+        self.counts[category] += 1
+        sample = self.samples.setdefault(category, [])
+        if len(sample) < DIAGNOSTICS_SAMPLE_SIZE:
+            sample.append(name)
+        if self.details is not None:
+            self.details.setdefault(category, []).append((name, detail))
+
+    def has_errors(self):
+        return bool(self.counts)
+
+    def sample(self, category):
+        names = self.samples[category]
+        if self.counts[category] > len(names):
+            names = names + ["[...]"]
+        return names
+
+    def log(self, logger):
+        for category, level, log_message, heading in DIAGNOSTIC_CATEGORIES:
+            if self.counts[category]:
+                getattr(logger, level)(
+                    "Non-Steam: {} ({} game(s)): {}".format(
+                        log_message,
+                        self.counts[category],
+                        ", ".join(self.sample(category)),
+                    )
+                )
+
+    def write_details(self, path):
+        with codecs.open(path, "w", "utf-8") as f:
+            for category, level, log_message, heading in DIAGNOSTIC_CATEGORIES:
+                if self.details.get(category):
+                    f.write(u"{} ({} game(s)):\n".format(log_message, self.counts[category]))
+                    f.writelines(
+                        u"{}\t{}\n".format(name, detail) if detail else name + u"\n"
+                        for name, detail in self.details[category]
+                    )
+                    f.write(u"\n")
+
+    def describe(self):
+        """
+        Returns one summary dialog section per category with games.
+        """
+        return [
+            heading.format(self.counts[category])
+            + "\n"
+            + "\n".join(self.sample(category))
+            for category, level, log_message, heading in DIAGNOSTIC_CATEGORIES
+            if self.counts[category]
+        ]
+
+
+def describe_duplicates(duplicates):
+    names = sorted(set(duplicates))
+    if len(names) > 10:
+        names = names[:10] + ["[...]"]
+    return "Kept {} shortcut(s) in shortcuts.vdf that share their name with another shortcut, only the first of each is updated: {}".format(
+        len(duplicates), ", ".join(names)
+    )
+
+
+def describe_action_changes(names):
+    names = sorted(names)
+    count = len(names)
+    if count > 10:
+        names = names[:10] + ["[...]"]
+    return "{} Playnite game(s) will be launched through Steam: {}".format(
+        count, ", ".join(names)
+    )
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def eligible_games():
+    """
+    Yields installed games in the database that have a play action and are not
+    handled by the Steam plugin.
+    """
+    for game in PlayniteApi.Database.Games:
+        if (
+            game.IsInstalled
+            and game.PluginId != STEAM_PLUGIN_GUID
+            and find_play_action(game)
+        ):
+            yield game
 
 
 def non_steam_shortcuts(menu_args):
-    games_updated = 0
-    games_new = 0
-    games_skipped_no_action = []
-    games_skipped_steam_native = []
-    games_skipped_bad_emulator = []
-    games_url = []
+    sync_non_steam_shortcuts([menu_args.Games])
+
+
+def non_steam_shortcuts_preview(menu_args):
+    sync_non_steam_shortcuts([menu_args.Games], preview=True)
+
+
+def non_steam_shortcuts_all(menu_args):
+    sync_non_steam_shortcuts(chunked(eligible_games(), SYNC_CHUNK_SIZE))
+
+
+def non_steam_shortcuts_all_preview(menu_args):
+    sync_non_steam_shortcuts(chunked(eligible_games(), SYNC_CHUNK_SIZE), preview=True)
+
+
+def sync_non_steam_shortcuts(game_chunks, preview=False):
+    """
+    Plans the shortcuts for game_chunks, then applies the plan.
+
+    With preview, the plan is shown first and only applied if confirmed.
+    """
+    planned_shortcuts = {}
+    # (game id, shortcut id) of every game with a planned shortcut, the games
+    # are looked up again when the plan is applied
+    action_updates = []
+    # Names of the games whose Playnite actions change
+    action_changes = []
+    diagnostics = Diagnostics(details=WRITE_DETAILS_LOG)
+    paths = PathResolver()
 
     steam_userdata = get_steam_userdata_dir()
     if not steam_userdata:
@@ -249,190 +1026,294 @@ def non_steam_shortcuts(menu_args):
             return
 
         try:
-            with open(shortcuts_vdf, "rb") as f:
-                steam_shortcuts = parse_shortcuts(f)
+            steam_shortcuts, vdf_damage, vdf_signature = load_shortcuts(shortcuts_vdf)
         except Exception as e:
             PlayniteApi.Dialogs.ShowErrorMessage(
                 traceback.format_exc(), "Error loading shortcuts.vdf"
             )
             return
+
+        # Saving the recovered shortcuts repairs the file
+        if vdf_damage:
+            for offset, error in vdf_damage:
+                __logger.Warn(
+                    "Non-Steam: shortcuts.vdf is damaged at offset {}: {}".format(
+                        offset, error
+                    )
+                )
+            repair = PlayniteApi.Dialogs.ShowMessage(
+                "shortcuts.vdf is damaged. {} intact shortcut(s) were recovered "
+                "and {} damaged part(s) of the file will be dropped.\n\n"
+                "Repair shortcuts.vdf? A copy of the damaged file will be kept as "
+                "shortcuts.vdf.damaged.".format(len(steam_shortcuts), len(vdf_damage)),
+                "Damaged shortcuts.vdf",
+                MessageBoxButton.YesNo,
+                MessageBoxImage.Warning,
+            )
+            if repair != MessageBoxResult.Yes:
+                return
+            try:
+                shutil.copyfile(shortcuts_vdf, shortcuts_vdf + ".damaged")
+            except Exception as e:
+                PlayniteApi.Dialogs.ShowErrorMessage(
+                    traceback.format_exc(), "Error backing up shortcuts.vdf"
+                )
+                return
     else:
         steam_shortcuts = {}
+        vdf_damage = []
+        vdf_signature = None
+
+    vdf_duplicates = duplicate_shortcuts(steam_shortcuts)
+    for appname in sorted(set(vdf_duplicates)):
+        __logger.Warn(
+            "Non-Steam: shortcuts.vdf has several shortcuts named {}, only the first one is updated".format(
+                appname
+            )
+        )
 
-    for game in menu_args.Games:
-        play_action = find_play_action(game)
+    # Games are processed in chunks, shortcuts.vdf is only written once at the end
+    for games in game_chunks:
+        shortcut_games = []
+        for game in games:
+            play_action = find_play_action(game)
 
-        # If a game somehow has no PlayAction, skip it
-        if not play_action:
-            games_skipped_no_action.append(game.Name)
-            __logger.Error("Non-Steam: Game has no PlayAction: {}".format(game.Name))
-            continue
-
-        # Skip the game if it is handled by the Steam plugin
-        if game.PluginId == STEAM_PLUGIN_GUID:
-            __logger.Warn(
-                "Non-Steam: Game is already a Steam game: {}".format(game.Name)
-            )
-            games_skipped_steam_native.append(game.Name)
-            continue
+            # If a game somehow has no PlayAction, skip it
+            if not play_action:
+                diagnostics.add("no_action", game.Name)
+                continue
 
-        # If a game has a URL PlayAction, use it anyway but log it
-        if play_action.Type == GameActionType.URL:
-            __logger.Warn(
-                "Non-Steam: Game has a URL as PlayAction: {}".format(game.Name)
-            )
-            games_url.append(game.Name)
-
-        # Create/Update Non-Steam shortcut
-        play_action_expanded = PlayniteApi.ExpandGameVariables(game, play_action)
-        if play_action_expanded.Type == GameActionType.Emulator:
-            emulator = PlayniteApi.Database.Emulators.Get(play_action.EmulatorId)
-            if emulator.Profiles:
-                profile = emulator.Profiles.FirstOrDefault(
-                    lambda a: a.Id == play_action.EmulatorProfileId
-                )
-            else:
-                profile = None
-            if not profile:
-                games_skipped_bad_emulator.append(game.Name)
+            # Skip the game if it is handled by the Steam plugin
+            if game.PluginId == STEAM_PLUGIN_GUID:
+                diagnostics.add("steam_native", game.Name)
                 continue
-            profile_expanded = emulator_expand_variables(profile, game)
-            start_dir = profile_expanded.WorkingDirectory
-            exe = profile_expanded.Executable
-            arguments = profile_expanded.Arguments or ""
-            if play_action_expanded.AdditionalArguments:
-                arguments += " " + play_action_expanded.AdditionalArguments
-            if play_action_expanded.OverrideDefaultArgs:
+
+            # If a game has a URL PlayAction, use it anyway but log it
+            if play_action.Type == GameActionType.URL:
+                diagnostics.add("url", game.Name, play_action.Path)
+
+            # Create/Update Non-Steam shortcut
+            play_action_expanded = PlayniteApi.ExpandGameVariables(game, play_action)
+            if play_action_expanded.Type == GameActionType.Emulator:
+                emulator = PlayniteApi.Database.Emulators.Get(play_action.EmulatorId)
+                if emulator.Profiles:
+                    profile = emulator.Profiles.FirstOrDefault(
+                        lambda a: a.Id == play_action.EmulatorProfileId
+                    )
+                else:
+                    profile = None
+                if not profile:
+                    diagnostics.add("bad_emulator", game.Name)
+                    continue
+                profile_expanded = emulator_expand_variables(profile, game)
+                start_dir = profile_expanded.WorkingDirectory
+                exe = profile_expanded.Executable
+                arguments = profile_expanded.Arguments or ""
+                if play_action_expanded.AdditionalArguments:
+                    arguments += " " + play_action_expanded.AdditionalArguments
+                if play_action_expanded.OverrideDefaultArgs:
+                    arguments = play_action_expanded.Arguments or ""
+            elif play_action_expanded.Type == GameActionType.File:
+                start_dir = play_action_expanded.WorkingDir
+                exe = play_action_expanded.Path
                 arguments = play_action_expanded.Arguments or ""
-        elif play_action_expanded.Type == GameActionType.File:
-            start_dir = play_action_expanded.WorkingDir
-            exe = play_action_expanded.Path
-            arguments = play_action_expanded.Arguments or ""
-        elif play_action_expanded.Type == GameActionType.URL:
-            exe = play_action_expanded.Path
-            start_dir = ""
-            arguments = ""
-        if not play_action_expanded.Type == GameActionType.URL:
-            if not start_dir:
-                start_dir = FileInfo(exe).Directory.FullName
-            exe = Path.Combine(start_dir, exe)
-        if game.Icon:
-            icon = PlayniteApi.Database.GetFullFilePath(game.Icon)
-        else:
-            icon = ""
-        shortcut = {
-            "icon": icon,
-            "exe": '"{}"'.format(exe),
-            "startdir": '"{}"'.format(start_dir),
-            "appname": game.Name,
-            "launchoptions": arguments,
-        }
-        if game.Name in steam_shortcuts:
-            games_updated += 1
-            steam_shortcuts[game.Name].update(shortcut)
-            shortcut = steam_shortcuts[game.Name]
-        else:
-            games_new += 1
-            shortcut.update(SHORTCUT_DEFAULTS)
-            steam_shortcuts[game.Name] = shortcut
-
-        # Update Playnite actions
-        # Only run once, don't create duplicate OtherActions
-        if play_action == game.PlayAction:
-            old_action = game.PlayAction
-            steam_action = GameAction(
-                Name="Non-Steam Steam Shortcut",
-                Type=GameActionType.URL,
-                Path=steam_URL(shortcut),
-                IsHandledByPlugin=False,
+            elif play_action_expanded.Type == GameActionType.URL:
+                exe = play_action_expanded.Path
+                start_dir = ""
+                arguments = ""
+            if not play_action_expanded.Type == GameActionType.URL:
+                start_dir, exe = paths.resolve_exe(exe, start_dir)
+                # Create the shortcut anyway, but warn about it
+                if not paths.exists(exe):
+                    diagnostics.add("missing_exe", game.Name, exe)
+            if game.Icon:
+                icon = PlayniteApi.Database.GetFullFilePath(game.Icon)
+                if not paths.exists(icon):
+                    diagnostics.add("missing_icon", game.Name, icon)
+            else:
+                icon = ""
+            shortcut = {
+                "icon": icon,
+                "exe": '"{}"'.format(exe),
+                "startdir": '"{}"'.format(start_dir),
+                "appname": game.Name,
+                "launchoptions": arguments,
+            }
+            # The existing shortcuts are left untouched until the plan is applied
+            if game.Name in steam_shortcuts:
+                updated_shortcut = dict(steam_shortcuts[game.Name])
+                updated_shortcut.update(shortcut)
+                shortcut = updated_shortcut
+            else:
+                shortcut.update(SHORTCUT_DEFAULTS)
+            planned_shortcuts[game.Name] = shortcut
+
+            shortcut_games.append((game, play_action, shortcut))
+
+        # Playnite actions and artwork are only updated once the plan is applied
+        shortcut_ids = steam_shortcut_ids(
+            [shortcut for game, play_action, shortcut in shortcut_games]
+        )
+        for (game, play_action, shortcut), shortcut_id in zip(
+            shortcut_games, shortcut_ids
+        ):
+            action_updates.append((game.Id, shortcut_id))
+            if play_action_changes(
+                game, play_action, steam_rungameid_URL(shortcut_id)
+            ):
+                action_changes.append(game.Name)
+
+    plan = ShortcutPlan(steam_shortcuts, planned_shortcuts)
+
+    diagnostics.log(__logger)
+    details_log = None
+    if WRITE_DETAILS_LOG and diagnostics.has_errors():
+        details_log = join(CurrentExtensionDataPath, "nonsteam_details.log")
+        try:
+            diagnostics.write_details(details_log)
+        except Exception as e:
+            __logger.Error(
+                "Non-Steam: Error writing {}: {}".format(details_log, traceback.format_exc())
             )
-            game.PlayAction = steam_action
-            if not game.OtherActions:
-                game.OtherActions = ObservableCollection[GameAction]()
-            old_action.Name = "Launch without Steam"
-            game.OtherActions.Insert(0, old_action)
-        else:
-            # play_action is already an OtherAction
-            # Just make sure the URL is up to date on the main PlayAction
-            game.PlayAction.Path = steam_URL(shortcut)
+            details_log = None
+
+    if preview:
+        message = plan.describe()
+        if action_changes:
+            message += "\n\n" + describe_action_changes(action_changes)
+        if vdf_damage:
+            message += "\n\nshortcuts.vdf will be repaired, dropping {} damaged part(s)".format(
+                len(vdf_damage)
+            )
+        if vdf_duplicates:
+            message += "\n\n" + describe_duplicates(vdf_duplicates)
+        if not (plan.has_changes() or action_changes or vdf_damage):
+            PlayniteApi.Dialogs.ShowMessage(message, "Preview Non-Steam Shortcuts")
+            return
+        confirm = PlayniteApi.Dialogs.ShowMessage(
+            message
+            + "\n\nArtwork is copied to Steam along with the changes."
+            + "\n\nApply these changes?",
+            "Preview Non-Steam Shortcuts",
+            MessageBoxButton.YesNo,
+            MessageBoxImage.Question,
+        )
+        if confirm != MessageBoxResult.Yes:
+            return
 
-    # Save updated shortcuts.vdf
+    # Save updated shortcuts.vdf, only if something changed
+    vdf_merged = False
+    if plan.has_changes() or vdf_damage:
+        save_error = None
+        try:
+            with ShortcutsLock(shortcuts_vdf):
+                try:
+                    vdf_merged = save_shortcuts(shortcuts_vdf, plan, vdf_signature)
+                except Exception as e:
+                    save_error = (traceback.format_exc(), "Error saving shortcuts.vdf")
+                    # shortcuts.vdf is only replaced once fully written, so
+                    # it is left alone and only the partial copy is removed
+                    if isfile(shortcuts_vdf + ".tmp"):
+                        try:
+                            os.remove(shortcuts_vdf + ".tmp")
+                        except (IOError, OSError):
+                            pass
+        except Exception as e:
+            save_error = (traceback.format_exc(), "Error locking shortcuts.vdf")
+        if save_error:
+            # Shown after releasing the lock, the dialog waits for the user
+            PlayniteApi.Dialogs.ShowErrorMessage(*save_error)
+            return
+
+    # Update Playnite actions and copy artwork to Steam, one chunk at a time
+    grid = GridArtworkSync(
+        join(steam_userdata, "config", "grid"),
+        join(CurrentExtensionDataPath, "grid_manifest.json"),
+    )
+    copy_artwork = True
+    for updates in chunked(action_updates, SYNC_CHUNK_SIZE):
+        artwork = []
+        for game_id, shortcut_id in updates:
+            game = PlayniteApi.Database.Games.Get(game_id)
+            # The game was removed or changed in the meantime
+            play_action = find_play_action(game) if game else None
+            if not play_action:
+                continue
+            update_play_actions(game, play_action, steam_rungameid_URL(shortcut_id))
+            artwork.extend(grid_artwork(game, shortcut_id, paths))
+        if not copy_artwork:
+            continue
+        try:
+            grid.run(artwork)
+        except Exception as e:
+            PlayniteApi.Dialogs.ShowErrorMessage(
+                traceback.format_exc(), "Error copying artwork to Steam"
+            )
+            copy_artwork = False
     try:
-        with open(shortcuts_vdf, "wb") as f:
-            dump_shortcuts(f, steam_shortcuts)
+        grid.save_manifest()
     except Exception as e:
-        PlayniteApi.Dialogs.ShowErrorMessage(
-            traceback.format_exc(), "Error saving shortcuts.vdf"
+        __logger.Error(
+            "Non-Steam: Error saving the grid manifest: {}".format(
+                traceback.format_exc()
+            )
         )
-        if isfile(shortcuts_vdf + ".bak"):
-            try:
-                shutil.copyfile(shortcuts_vdf + ".bak", shortcuts_vdf)
-                PlayniteApi.Dialogs.ShowMessage(
-                    "Successfully restored shortcuts.vdf backup"
-                )
-            except Exception as e:
-                PlayniteApi.Dialogs.ShowErrorMessage(
-                    traceback.format_exc(), "Error restoring shortcuts.vdf backup"
-                )
-        else:
-            os.remove(shortcuts_vdf)
-        return
 
-    # Truncate long lists of games
-    if len(games_skipped_steam_native) > 10:
-        games_skipped_steam_native = games_skipped_steam_native[:10] + ["[...]"]
-    if len(games_skipped_no_action) > 10:
-        games_skipped_no_action = games_skipped_no_action[:10] + ["[...]"]
-    if len(games_skipped_bad_emulator) > 10:
-        games_skipped_bad_emulator = games_skipped_bad_emulator[:10] + ["[...]"]
-    if len(games_url) > 10:
-        games_url = games_url[:10] + ["[...]"]
-
-    errors = False
-    message = "Please relaunch Steam to update non-Steam shortcuts!\n\n"
-    message += "Updated {} existing non-Steam shortcuts\n".format(games_updated)
-    message += "Created {} new non-Steam shortcuts".format(games_new)
-    if games_skipped_steam_native:
-        message += "\n\nSkipped {} native Steam game(s):\n".format(
-            len(games_skipped_steam_native)
-        )
-        message += "\n".join(games_skipped_steam_native)
-        errors = True
-    if games_skipped_no_action:
-        message += "\n\nSkipped {} game(s) without any PlayAction set (not installed?):\n".format(
-            len(games_skipped_no_action)
+    lines = []
+    if plan.has_changes():
+        lines.append("Please relaunch Steam to update non-Steam shortcuts!\n")
+    else:
+        lines.append("No changes to shortcuts.vdf were needed\n")
+    lines.append("Updated {} existing non-Steam shortcuts".format(len(plan.updated)))
+    lines.append("Created {} new non-Steam shortcuts".format(len(plan.added)))
+    lines.append(
+        "{} non-Steam shortcuts were already up to date".format(len(plan.unchanged))
+    )
+    if grid.linked or grid.copied:
+        lines.append(
+            "Copied {} artwork image(s) to Steam".format(grid.linked + grid.copied)
         )
-        message += "\n".join(games_skipped_no_action)
-        errors = True
-    if games_skipped_bad_emulator:
-        message += "\n\nSkipped {} emulated game(s) with bad emulator profiles:\n".format(
-            len(games_skipped_bad_emulator)
+    if vdf_damage:
+        lines.append(
+            "Repaired shortcuts.vdf, dropped {} damaged part(s)".format(len(vdf_damage))
         )
-        message += "\n".join(games_skipped_bad_emulator)
-        errors = True
-    if games_url:
-        message += "\n\nWarning: Some games had URL launch actions. (Typically managed by a library plugin.) "
-        message += (
-            "You may wish to update their actions and recreate non-Steam shortcuts. "
+    if vdf_duplicates:
+        lines.append(describe_duplicates(vdf_duplicates))
+    if vdf_merged:
+        lines.append(
+            "shortcuts.vdf was changed by another program during the update, the changes were merged"
         )
-        message += "Steam will still launch these games, but the Steam overlay will not function."
-        message += "\n\nThe following {} game(s) had URL launch actions:\n".format(
-            len(games_url)
+    sections = ["\n".join(lines)]
+    if grid.errors:
+        sections.append(
+            "Failed to copy {} artwork image(s) to Steam".format(len(grid.errors))
         )
-        message += "\n".join(games_url)
-        errors = True
-    if errors:
-        message += "\n\nOpen playnite.log for full list of errors?"
+    sections.extend(diagnostics.describe())
+
+    if len(sections) > 1 and details_log:
+        sections.append("Open {} for the full list of games?".format(details_log))
         show_log = PlayniteApi.Dialogs.ShowMessage(
-            message,
+            "\n\n".join(sections),
             "Updated Non-Steam Shortcuts",
             MessageBoxButton.YesNo,
             MessageBoxImage.Error,
         )
         if show_log == MessageBoxResult.Yes:
-            open_playnite_log()
+            os.startfile(details_log)
+    elif len(sections) > 1:
+        # playnite.log only has the same sample of games as this dialog
+        if not WRITE_DETAILS_LOG:
+            sections.append(
+                "Set WRITE_DETAILS_LOG = True at the top of nonsteam.py to write the full list of games to nonsteam_details.log."
+            )
+        PlayniteApi.Dialogs.ShowMessage(
+            "\n\n".join(sections),
+            "Updated Non-Steam Shortcuts",
+            MessageBoxButton.OK,
+            MessageBoxImage.Error,
+        )
     else:
-        PlayniteApi.Dialogs.ShowMessage(message, "Updated Non-Steam Shortcuts")
+        PlayniteApi.Dialogs.ShowMessage(sections[0], "Updated Non-Steam Shortcuts")
 
 
 ###############################################################################
@@ -469,6 +1350,15 @@ is a good place to start from.
 
 The algorithms Bit by Bit, Bit by Bit Fast and Table-Driven are implemented.
 
+Well-known parameter sets (see NATIVE_PRESETS) are recognised when a Crc object
+is constructed, and all three algorithms are then computed by the native
+routines of the binascii module instead.  Pass native = False to the
+constructor to always use the Python implementation.
+
+Crc.new() returns a CrcState object which computes a CRC incrementally with
+update(), copy() and digest(), and Crc.combine() computes the CRC of two
+concatenated messages from their CRC values.
+
 This module can also be used as a library from within Python.
 
 Examples
@@ -484,8 +1374,73 @@ This is an example use of the different algorithms:
 >>> print("0x%x" % crc.bit_by_bit("123456789"))
 >>> print("0x%x" % crc.bit_by_bit_fast("123456789"))
 >>> print("0x%x" % crc.table_driven("123456789"))
+>>>
+>>> state = crc.new("12345")
+>>> state.update("6789")
+>>> print("0x%x" % state.digest())
+>>> print("0x%x" % crc.combine(crc.table_driven("12345"), crc.table_driven("6789"), 4))
 """
 
+import binascii
+
+
+# Native presets
+###############################################################################
+def _crc32(in_str, crc):
+    return binascii.crc32(in_str, crc) & 0xFFFFFFFF
+
+
+def _jamcrc(in_str, crc):
+    return _crc32(in_str, crc ^ 0xFFFFFFFF) ^ 0xFFFFFFFF
+
+
+def _crc_hqx(in_str, crc):
+    return binascii.crc_hqx(in_str, crc)
+
+
+def _crc_hqx_xor_out(in_str, crc):
+    return binascii.crc_hqx(in_str, crc ^ 0xFFFF) ^ 0xFFFF
+
+
+# Maps (width, poly, reflect_in, xor_in, reflect_out, xor_out) to the tuple
+# (name, function, init).  function(in_str, crc) continues the CRC value crc
+# with in_str, and init is the CRC value of the empty string.
+NATIVE_PRESETS = {}
+
+
+# function register_native_preset
+###############################################################################
+def register_native_preset(
+    name, width, poly, reflect_in, xor_in, reflect_out, xor_out, function, init
+):
+    """
+    Register a native routine for a CRC parameter set.
+    """
+    NATIVE_PRESETS[
+        (width, poly, bool(reflect_in), xor_in, bool(reflect_out), xor_out)
+    ] = (name, function, init)
+
+
+register_native_preset(
+    "CRC-32", 32, 0x04C11DB7, True, 0xFFFFFFFF, True, 0xFFFFFFFF, _crc32, 0x00000000
+)
+register_native_preset(
+    "JAMCRC", 32, 0x04C11DB7, True, 0xFFFFFFFF, True, 0x00000000, _jamcrc, 0xFFFFFFFF
+)
+register_native_preset(
+    "CRC-16/XMODEM", 16, 0x1021, False, 0x0000, False, 0x0000, _crc_hqx, 0x0000
+)
+register_native_preset(
+    "CRC-16/CCITT-FALSE", 16, 0x1021, False, 0xFFFF, False, 0x0000, _crc_hqx, 0xFFFF
+)
+register_native_preset(
+    "CRC-16/GENIBUS", 16, 0x1021, False, 0xFFFF, False, 0xFFFF, _crc_hqx_xor_out, 0x0000
+)
+register_native_preset(
+    "CRC-16/GSM", 16, 0x1021, False, 0x0000, False, 0xFFFF, _crc_hqx_xor_out, 0xFFFF
+)
+
+
 # Class Crc
 ###############################################################################
 class Crc(object):
@@ -504,6 +1459,7 @@ class Crc(object):
         reflect_out,
         xor_out,
         table_idx_width=None,
+        native=True,
     ):
         """The Crc constructor.
 
@@ -514,6 +1470,8 @@ class Crc(object):
             xor_in
             reflect_out
             xor_out
+            table_idx_width
+            native: use a native routine if the parameters match a preset
         """
         self.Width = width
         self.Poly = poly
@@ -537,6 +1495,20 @@ class Crc(object):
             self.CrcShift = 8 - self.Width
         else:
             self.CrcShift = 0
+        self.Table = None
+
+        self.NativeName, self.Native, self.NativeInit = None, None, None
+        if native:
+            key = (
+                self.Width,
+                self.Poly,
+                bool(self.ReflectIn),
+                self.XorIn,
+                bool(self.ReflectOut),
+                self.XorOut,
+            )
+            if key in NATIVE_PRESETS:
+                self.NativeName, self.Native, self.NativeInit = NATIVE_PRESETS[key]
 
     # function __get_nondirect_init
     ###############################################################################
@@ -574,6 +1546,9 @@ class Crc(object):
         by bit over the augmented input message and returns the calculated CRC
         value at the end.
         """
+        if self.Native is not None:
+            return self.Native(in_str, self.NativeInit)
+
         register = self.NonDirectInit
         for c in in_str:
             octet = ord(c)
@@ -603,6 +1578,9 @@ class Crc(object):
         does not need to loop over the augmented bits, i.e. the Width 0-bits
         wich are appended to the input message in the bit-by-bit algorithm.
         """
+        if self.Native is not None:
+            return self.Native(in_str, self.NativeInit)
+
         register = self.DirectInit
         for c in in_str:
             octet = ord(c)
@@ -652,11 +1630,26 @@ class Crc(object):
     ###############################################################################
     def table_driven(self, in_str):
         """
-        The Standard table_driven CRC algorithm.
+        The Standard table_driven CRC algorithm.  The table is generated on the
+        first call and reused afterwards.
         """
-        tbl = self.gen_table()
+        if self.Native is not None:
+            return self.Native(in_str, self.NativeInit)
+
+        return self.__table_driven(self.DirectInit, in_str)
 
-        register = self.DirectInit << self.CrcShift
+    # function __table_driven
+    ###############################################################################
+    def __table_driven(self, register, in_str):
+        """
+        Run the table_driven CRC algorithm over in_str, starting with the direct
+        register value register.
+        """
+        if self.Table is None:
+            self.Table = self.gen_table()
+        tbl = self.Table
+
+        register = register << self.CrcShift
         if not self.ReflectIn:
             for c in in_str:
                 tblidx = (
@@ -678,9 +1671,155 @@ class Crc(object):
                 )
             register = self.reflect(register, self.Width + self.CrcShift) & self.Mask
 
+        return self.__get_crc(register)
+
+    # function __get_crc
+    ###############################################################################
+    def __get_crc(self, register):
+        """
+        return the CRC value of a direct register value.
+        """
         if self.ReflectOut:
             register = self.reflect(register, self.Width)
         return register ^ self.XorOut
 
+    # function __get_register
+    ###############################################################################
+    def __get_register(self, crc):
+        """
+        return the direct register value of a CRC value, i.e. the inverse of
+        __get_crc.
+        """
+        register = crc ^ self.XorOut
+        if self.ReflectOut:
+            register = self.reflect(register, self.Width)
+        return register
+
+    # function update
+    ###############################################################################
+    def update(self, crc, in_str):
+        """
+        Continue the calculation of crc, the CRC value of a message, with in_str
+        and return the CRC value of the message followed by in_str.
+        """
+        if self.Native is not None:
+            return self.Native(in_str, crc)
+
+        return self.__table_driven(self.__get_register(crc), in_str)
+
+    # function new
+    ###############################################################################
+    def new(self, in_str=""):
+        """
+        return a new CrcState object, optionally initialised with in_str.
+        """
+        state = CrcState(self, self.table_driven(""))
+        state.update(in_str)
+        return state
+
+    # function combine
+    ###############################################################################
+    def combine(self, crc1, crc2, len2):
+        """
+        return the CRC value of the concatenation of two messages, given the CRC
+        value crc1 of the first message, and the CRC value crc2 and the length
+        len2 of the second message.  Shifting the first register past the second
+        message takes O(log(len2)) matrix operations, as in zlib's crc32_combine.
+        """
+        register = self.__shift_zeros(self.__get_register(crc1) ^ self.DirectInit, len2)
+        return self.__get_crc(register ^ self.__get_register(crc2))
+
+    # function __shift_zeros
+    ###############################################################################
+    def __shift_zeros(self, register, length):
+        """
+        return the direct register value after feeding length zero bytes into
+        register.
+        """
+        # Operator for one zero bit; column i is the image of bit i
+        mat = [(1 << (i + 1)) & self.Mask for i in range(self.Width)]
+        mat[self.Width - 1] = self.Poly & self.Mask
+        # Operator for one zero byte
+        for i in range(3):
+            mat = self.__gf2_matrix_square(mat)
+        while length:
+            if length & 1:
+                register = self.__gf2_matrix_times(mat, register)
+            length >>= 1
+            if length:
+                mat = self.__gf2_matrix_square(mat)
+        return register
+
+    # function __gf2_matrix_times
+    ###############################################################################
+    def __gf2_matrix_times(self, mat, vec):
+        """
+        multiply a GF(2) matrix, given as a list of columns, with a vector.
+        """
+        result = 0
+        i = 0
+        while vec:
+            if vec & 0x01:
+                result ^= mat[i]
+            vec >>= 1
+            i += 1
+        return result
+
+    # function __gf2_matrix_square
+    ###############################################################################
+    def __gf2_matrix_square(self, mat):
+        """
+        square a GF(2) matrix.
+        """
+        return [self.__gf2_matrix_times(mat, col) for col in mat]
+
+
+# Class CrcState
+###############################################################################
+class CrcState(object):
+    """
+    The state of an incremental CRC calculation, see Crc.new().
+    """
+
+    # Class constructor
+    ###############################################################################
+    def __init__(self, crc, value, length=0):
+        """The CrcState constructor.
+
+        The parameters are as follows:
+            crc: the Crc object
+            value: the CRC value of the data processed so far
+            length: the length of the data processed so far
+        """
+        self.Crc = crc
+        self.Value = value
+        self.Length = length
+
+    # function update
+    ###############################################################################
+    def update(self, in_str):
+        """
+        process in_str.
+        """
+        self.Value = self.Crc.update(self.Value, in_str)
+        self.Length += len(in_str)
+
+    # function copy
+    ###############################################################################
+    def copy(self):
+        """
+        return an independent copy of this state, e.g. to reuse the state of a
+        common prefix for several messages.
+        """
+        return CrcState(self.Crc, self.Value, self.Length)
+
+    # function digest
+    ###############################################################################
+    def digest(self):
+        """
+        return the CRC value of the data processed so far.
+        """
+        return self.Value
+
 
 #### End crc_algorithms
@@ -0,0 +1,108 @@
+"""
+Imports nonsteam.py outside of Playnite, for the tests and benchmarks.
+
+Playnite runs nonsteam.py with IronPython 2.7, which provides the clr, System
+and Playnite modules, and injects PlayniteApi, __logger and
+CurrentExtensionDataPath into the script. Here they are replaced with stubs.
+That is enough for the parts of nonsteam.py that only use the standard
+library, such as the shortcuts.vdf parser and writer and the shortcut ids.
+"""
+
+import os
+import sys
+import types
+import unittest
+
+if sys.version_info[0] > 2:
+    raise unittest.SkipTest("nonsteam.py is IronPython 2.7 code")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STUB_MODULES = (
+    "clr",
+    "System",
+    "System.Guid",
+    "System.Collections",
+    "System.Collections.ObjectModel",
+    "System.IO",
+    "System.Windows",
+    "Playnite",
+    "Playnite.SDK",
+    "Playnite.SDK.Plugins",
+)
+
+
+class Stub(object):
+    """
+    Stands in for any .NET class, object or function.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub()
+
+    def __call__(self, *args, **kwargs):
+        return Stub()
+
+
+class StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub()
+
+
+class Logger(object):
+    """
+    Records messages like Playnite's ILogger.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def Debug(self, message):
+        self.messages.append(("Debug", message))
+
+    def Info(self, message):
+        self.messages.append(("Info", message))
+
+    def Warn(self, message):
+        self.messages.append(("Warn", message))
+
+    def Error(self, message):
+        self.messages.append(("Error", message))
+
+
+def import_nonsteam():
+    """
+    Returns the nonsteam module, with a fresh Logger as its __logger.
+    """
+    for name in STUB_MODULES:
+        if name not in sys.modules:
+            sys.modules[name] = StubModule(name)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import nonsteam
+
+    nonsteam.PlayniteApi = Stub()
+    setattr(nonsteam, "__logger", Logger())
+    return nonsteam
+
+
+def shortcut(nonsteam, appname, exe="", **fields):
+    """
+    Returns a shortcut like the ones sync_non_steam_shortcuts() builds.
+    """
+    values = dict(nonsteam.SHORTCUT_DEFAULTS)
+    values.update(
+        {
+            "appname": appname,
+            "exe": '"{}"'.format(exe or appname + ".exe"),
+            "startdir": '""',
+            "icon": "",
+            "launchoptions": "",
+        }
+    )
+    values.update(fields)
+    return values
@@ -0,0 +1,177 @@
+"""
+Checks that the native presets and the Python implementation in
+crc_algorithms.py agree.
+
+Every preset in NATIVE_PRESETS is computed with binascii and with native=False,
+by all three algorithms, incrementally with new()/update()/copy() and with
+combine(). combine() and update() are also checked for parameters without a
+native preset. Playnite only loads nonsteam.py, which embeds a copy of
+crc_algorithms.py, and that copy is checked to match.
+
+    python2.7 -m unittest discover -s tests
+"""
+
+import ast
+import os
+import random
+import sys
+import unittest
+
+if sys.version_info[0] > 2:
+    raise unittest.SkipTest("crc_algorithms.py works on Python 2 byte strings")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from crc_algorithms import Crc, NATIVE_PRESETS
+
+ALGORITHMS = ["bit_by_bit", "bit_by_bit_fast", "table_driven"]
+
+# Lines around the copy of crc_algorithms.py in nonsteam.py
+EMBEDDED_START = "### crc_algorithms.py (Playnite won't import python files)\n"
+EMBEDDED_END = "#### End crc_algorithms\n"
+
+# name: CRC of "123456789"
+CHECK_VALUES = {
+    "CRC-32": 0xCBF43926,
+    "JAMCRC": 0x340BC6D9,
+    "CRC-16/XMODEM": 0x31C3,
+    "CRC-16/CCITT-FALSE": 0x29B1,
+    "CRC-16/GENIBUS": 0xD64E,
+    "CRC-16/GSM": 0xCE3C,
+}
+
+# (width, poly, reflect_in, xor_in, reflect_out, xor_out) without native presets
+PYTHON_ONLY = [
+    (5, 0x05, True, 0x1F, True, 0x1F),
+    (8, 0x07, False, 0x00, False, 0x00),
+    (12, 0x80F, False, 0x000, True, 0x000),
+    (16, 0x8005, True, 0x0000, True, 0x0000),
+    (32, 0x1EDC6F41, True, 0xFFFFFFFF, True, 0xFFFFFFFF),
+    (64, 0x42F0E1EBA9EA3693, False, 0x0, False, 0x0),
+]
+
+
+def random_messages(count, max_length):
+    rand = random.Random(0)
+    messages = ["", "123456789"]
+    for _ in range(count):
+        length = rand.randrange(max_length)
+        messages.append("".join(chr(rand.randrange(256)) for _ in range(length)))
+    return messages
+
+
+def presets():
+    for params, (name, function, init) in sorted(NATIVE_PRESETS.items()):
+        yield name, Crc(*params), Crc(*params, native=False)
+
+
+class NativeParityTest(unittest.TestCase):
+    def setUp(self):
+        self.messages = random_messages(200, 64)
+
+    def test_presets_are_native(self):
+        for name, native, python in presets():
+            self.assertEqual(native.NativeName, name)
+            self.assertIsNotNone(native.Native)
+            self.assertIsNone(python.Native)
+
+    def test_check_values(self):
+        for name, native, python in presets():
+            for crc in (native, python):
+                for algorithm in ALGORITHMS:
+                    self.assertEqual(
+                        getattr(crc, algorithm)("123456789"),
+                        CHECK_VALUES[name],
+                        (name, crc.Native, algorithm),
+                    )
+
+    def test_algorithms(self):
+        for name, native, python in presets():
+            for message in self.messages:
+                expected = python.bit_by_bit(message)
+                for crc in (native, python):
+                    for algorithm in ALGORITHMS:
+                        self.assertEqual(
+                            getattr(crc, algorithm)(message),
+                            expected,
+                            (name, crc.Native, algorithm, message),
+                        )
+
+    def test_incremental(self):
+        for name, native, python in presets():
+            for message in self.messages:
+                expected = python.bit_by_bit(message)
+                split = len(message) // 3
+                for crc in (native, python):
+                    state = crc.new(message[:split])
+                    prefix = state.copy()
+                    state.update(message[split:])
+                    self.assertEqual(state.digest(), expected, (name, crc.Native))
+                    self.assertEqual(state.Length, len(message))
+                    # The copy is not affected by updating the original
+                    self.assertEqual(prefix.digest(), crc.table_driven(message[:split]))
+                    self.assertEqual(
+                        crc.update(prefix.digest(), message[split:]), expected
+                    )
+
+    def test_combine(self):
+        for name, native, python in presets():
+            for message in self.messages:
+                split = len(message) // 2
+                first, second = message[:split], message[split:]
+                for crc in (native, python):
+                    self.assertEqual(
+                        crc.combine(
+                            crc.table_driven(first),
+                            crc.table_driven(second),
+                            len(second),
+                        ),
+                        python.bit_by_bit(message),
+                        (name, crc.Native, message),
+                    )
+
+
+class PythonOnlyTest(unittest.TestCase):
+    def setUp(self):
+        self.messages = random_messages(50, 48)
+
+    def test_incremental_and_combine(self):
+        for params in PYTHON_ONLY:
+            crc = Crc(*params)
+            self.assertIsNone(crc.Native)
+            for message in self.messages:
+                expected = crc.bit_by_bit(message)
+                for algorithm in ALGORITHMS[1:]:
+                    self.assertEqual(
+                        getattr(crc, algorithm)(message), expected, (params, algorithm)
+                    )
+                split = len(message) // 3
+                state = crc.new(message[:split])
+                state.update(message[split:])
+                self.assertEqual(state.digest(), expected, params)
+                self.assertEqual(
+                    crc.combine(
+                        crc.bit_by_bit(message[:split]),
+                        crc.bit_by_bit(message[split:]),
+                        len(message) - split,
+                    ),
+                    expected,
+                    params,
+                )
+
+
+class EmbeddedCopyTest(unittest.TestCase):
+    def test_nonsteam_copy_is_identical(self):
+        with open(os.path.join(ROOT, "crc_algorithms.py")) as f:
+            original = f.read()
+        with open(os.path.join(ROOT, "nonsteam.py")) as f:
+            nonsteam = f.read()
+        start = nonsteam.index(EMBEDDED_START) + len(EMBEDDED_START)
+        embedded = nonsteam[start : nonsteam.index(EMBEDDED_END, start)]
+        # Formatting and comments may differ, the code may not
+        self.assertEqual(ast.dump(ast.parse(embedded)), ast.dump(ast.parse(original)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Tests for Diagnostics, which collects the skipped and warned about games.
+"""
+
+# Skips the tests on Python 3, so it comes first
+from playnite_stubs import Logger, import_nonsteam
+
+import codecs
+import os
+import shutil
+import tempfile
+import unittest
+
+nonsteam = import_nonsteam()
+
+
+def add_games(diagnostics, category, count):
+    for i in range(count):
+        diagnostics.add(
+            category, u"{} {}".format(category, i), u"detail {}".format(i)
+        )
+
+
+class DiagnosticsTest(unittest.TestCase):
+    def setUp(self):
+        self.size = nonsteam.DIAGNOSTICS_SAMPLE_SIZE
+        self.diagnostics = nonsteam.Diagnostics(details=True)
+        add_games(self.diagnostics, "missing_exe", self.size + 5)
+        add_games(self.diagnostics, "no_action", 2)
+
+    def test_counts(self):
+        self.assertTrue(self.diagnostics.has_errors())
+        self.assertEqual(
+            dict(self.diagnostics.counts),
+            {"missing_exe": self.size + 5, "no_action": 2},
+        )
+        self.assertFalse(nonsteam.Diagnostics().has_errors())
+
+    def test_sample(self):
+        self.assertEqual(
+            self.diagnostics.sample("no_action"), [u"no_action 0", u"no_action 1"]
+        )
+        sample = self.diagnostics.sample("missing_exe")
+        self.assertEqual(len(sample), self.size + 1)
+        self.assertEqual(sample[0], u"missing_exe 0")
+        self.assertEqual(sample[-1], "[...]")
+        # The sample is not changed by sample()
+        self.assertEqual(len(self.diagnostics.samples["missing_exe"]), self.size)
+
+    def test_log(self):
+        logger = Logger()
+        self.diagnostics.log(logger)
+        # One record per category, in DIAGNOSTIC_CATEGORIES order
+        self.assertEqual(
+            [level for level, message in logger.messages], ["Error", "Warn"]
+        )
+        self.assertEqual(
+            logger.messages[0][1],
+            "Non-Steam: Games have no PlayAction (2 game(s)): no_action 0, no_action 1",
+        )
+        self.assertIn(
+            "Game executables do not exist ({} game(s))".format(self.size + 5),
+            logger.messages[1][1],
+        )
+        self.assertTrue(logger.messages[1][1].endswith(", [...]"))
+
+    def test_describe(self):
+        sections = self.diagnostics.describe()
+        self.assertEqual(len(sections), 2)
+        self.assertTrue(
+            sections[0].startswith("Skipped 2 game(s) without any PlayAction")
+        )
+        self.assertEqual(sections[1].splitlines()[-1], "[...]")
+
+    def test_write_details(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "nonsteam_details.log")
+            self.diagnostics.write_details(path)
+            with codecs.open(path, "r", "utf-8") as f:
+                lines = f.read().splitlines()
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(
+            lines[:4],
+            [
+                u"Games have no PlayAction (2 game(s)):",
+                u"no_action 0\tdetail 0",
+                u"no_action 1\tdetail 1",
+                u"",
+            ],
+        )
+        # Every game is written, not only the sample
+        self.assertEqual(
+            lines[4],
+            u"Game executables do not exist ({} game(s)):".format(self.size + 5),
+        )
+        self.assertEqual(len(lines), 4 + 1 + self.size + 5 + 1)
+        self.assertEqual(
+            lines[-2], u"missing_exe {0}\tdetail {0}".format(self.size + 4)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
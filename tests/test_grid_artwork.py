@@ -0,0 +1,116 @@
+"""
+Tests for GridArtworkSync, which copies artwork into Steam's config/grid.
+"""
+
+# Skips the tests on Python 3, so it comes first
+from playnite_stubs import import_nonsteam
+
+import os
+import shutil
+import tempfile
+import unittest
+
+nonsteam = import_nonsteam()
+
+
+class GridArtworkSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.grid_dir = os.path.join(self.dir, "grid")
+        self.manifest = os.path.join(self.dir, "grid_manifest.json")
+        self.artwork = []
+        os.mkdir(os.path.join(self.dir, "images"))
+        for i in range(10):
+            source = os.path.join(self.dir, "images", "{}.jpg".format(i))
+            with open(source, "wb") as f:
+                f.write(os.urandom(1000 + i))
+            self.artwork.append((source, "{}p.jpg".format(0x80000000 + i)))
+
+        self.hashed = []
+        self.file_hash = nonsteam.file_hash
+
+        def file_hash(path):
+            self.hashed.append(path)
+            return self.file_hash(path)
+
+        nonsteam.file_hash = file_hash
+
+    def tearDown(self):
+        nonsteam.file_hash = self.file_hash
+        shutil.rmtree(self.dir)
+
+    def run_sync(self):
+        del self.hashed[:]
+        grid = nonsteam.GridArtworkSync(self.grid_dir, self.manifest)
+        # One run per chunk of games
+        grid.run(self.artwork[:4])
+        grid.run(self.artwork[4:])
+        grid.save_manifest()
+        return grid
+
+    def assertSynced(self):
+        for source, filename in self.artwork:
+            with open(source, "rb") as f, open(
+                os.path.join(self.grid_dir, filename), "rb"
+            ) as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_first_run(self):
+        grid = self.run_sync()
+        self.assertEqual(grid.linked + grid.copied, len(self.artwork))
+        self.assertEqual(grid.errors, [])
+        self.assertTrue(os.path.isfile(self.manifest))
+        self.assertSynced()
+
+    def test_rerun_does_no_io(self):
+        self.run_sync()
+        os.utime(self.manifest, (1, 1))
+        grid = self.run_sync()
+        self.assertEqual(grid.unchanged, len(self.artwork))
+        self.assertEqual(grid.linked + grid.copied, 0)
+        self.assertEqual(self.hashed, [])
+        # The manifest is not written again
+        self.assertEqual(os.path.getmtime(self.manifest), 1)
+
+    def test_rerun_without_manifest(self):
+        self.run_sync()
+        os.remove(self.manifest)
+        grid = self.run_sync()
+        # Images are hashed to rebuild the manifest, but not copied again
+        self.assertEqual(grid.unchanged, len(self.artwork))
+        self.assertEqual(grid.linked + grid.copied, 0)
+        self.assertTrue(self.hashed)
+        self.assertTrue(os.path.isfile(self.manifest))
+
+    def test_changed_source(self):
+        self.run_sync()
+        source = self.artwork[0][0]
+        # Replace the file, like an image editor would, instead of writing to
+        # a file that may be hard-linked into the grid folder
+        os.remove(source)
+        with open(source, "wb") as f:
+            f.write(os.urandom(2000))
+        grid = self.run_sync()
+        self.assertEqual(grid.linked + grid.copied, 1)
+        self.assertEqual(grid.unchanged, len(self.artwork) - 1)
+        self.assertSynced()
+
+    def test_invalid_manifest(self):
+        with open(self.manifest, "w") as f:
+            f.write("{")
+        grid = self.run_sync()
+        self.assertEqual(grid.linked + grid.copied, len(self.artwork))
+        self.assertIn(
+            ("Warn", "Non-Steam: Ignoring invalid grid manifest"),
+            nonsteam.get_logger().messages,
+        )
+
+    def test_missing_source(self):
+        os.remove(self.artwork[0][0])
+        grid = self.run_sync()
+        self.assertEqual(grid.errors, [self.artwork[0][0]])
+        self.assertEqual(grid.linked + grid.copied, len(self.artwork) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
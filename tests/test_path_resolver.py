@@ -0,0 +1,68 @@
+"""
+Tests for PathResolver.exists(), which lists each directory only once.
+"""
+
+# Skips the tests on Python 3, so it comes first
+from playnite_stubs import import_nonsteam
+
+import os
+import shutil
+import tempfile
+import unittest
+
+nonsteam = import_nonsteam()
+
+
+class PathResolverExistsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name in ("Game.exe", "setup.exe"):
+            open(os.path.join(self.dir, name), "w").close()
+        self.listed = []
+        self.listdir = os.listdir
+        self.normcase = os.path.normcase
+
+        def listdir(path):
+            self.listed.append(path)
+            return self.listdir(path)
+
+        os.listdir = listdir
+
+    def tearDown(self):
+        os.listdir = self.listdir
+        os.path.normcase = self.normcase
+        shutil.rmtree(self.dir)
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_listing_is_reused(self):
+        paths = nonsteam.PathResolver()
+        self.assertTrue(paths.exists(self.path("Game.exe")))
+        self.assertTrue(paths.exists(self.path("setup.exe")))
+        self.assertFalse(paths.exists(self.path("missing.exe")))
+        self.assertTrue(paths.exists(os.path.join(self.dir, ".", "Game.exe")))
+        self.assertEqual(self.listed, [self.dir])
+
+    def test_case_is_folded(self):
+        # Like ntpath.normcase() on Windows, where Playnite runs
+        os.path.normcase = lambda path: path.lower()
+        paths = nonsteam.PathResolver()
+        self.assertTrue(paths.exists(self.path("GAME.EXE")))
+        self.assertTrue(paths.exists(self.path("Setup.exe")))
+        self.assertTrue(paths.exists(os.path.join(self.dir.upper(), "game.exe")))
+        self.assertEqual(len(self.listed), 1)
+
+    def test_missing_directory(self):
+        paths = nonsteam.PathResolver()
+        missing = os.path.join(self.dir, "missing")
+        self.assertFalse(paths.exists(os.path.join(missing, "Game.exe")))
+        self.assertFalse(paths.exists(os.path.join(missing, "setup.exe")))
+        self.assertEqual(self.listed, [missing])
+        # The file is still found in a directory that exists
+        self.assertTrue(paths.exists(self.path("Game.exe")))
+        self.assertEqual(self.listed, [missing, self.dir])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests for reading shortcuts.vdf with recover_shortcuts(), including a fuzz test
+with truncated and bit flipped files.
+"""
+
+# Skips the tests on Python 3, so it comes first
+from playnite_stubs import import_nonsteam, shortcut
+
+import random
+import time
+import unittest
+from cStringIO import StringIO
+
+nonsteam = import_nonsteam()
+
+
+def library(count):
+    shortcuts = {}
+    for i in range(count):
+        appname = u"Game {}".format(i)
+        shortcuts[appname] = shortcut(
+            nonsteam, appname, launchoptions=u"-x", tags={u"0": u"favorite"}
+        )
+    return shortcuts
+
+
+def dump(shortcuts):
+    stream = StringIO()
+    nonsteam.dump_shortcuts(stream, shortcuts)
+    return stream.getvalue()
+
+
+def recover(data):
+    return nonsteam.recover_shortcuts(StringIO(data))
+
+
+class RecoverShortcutsTest(unittest.TestCase):
+    def test_intact(self):
+        shortcuts = library(50)
+        self.assertEqual(recover(dump(shortcuts)), (shortcuts, []))
+
+    def test_empty(self):
+        self.assertEqual(recover(dump({})), ({}, []))
+
+    def test_truncated(self):
+        shortcuts = library(5)
+        data = dump(shortcuts)
+        for length in range(len(data) - 1):
+            recovered, damage = recover(data[:length])
+            self.assertTrue(damage, length)
+            for appname, values in recovered.iteritems():
+                self.assertEqual(values, shortcuts[appname], length)
+
+    def test_damaged_entry_is_skipped(self):
+        shortcuts = library(3)
+        data = dump(shortcuts)
+        # Replace the type byte of a field of the middle entry
+        pos = data.index("\x01exe\x00", data.index("Game 1"))
+        recovered, damage = recover(data[:pos] + "\x07" + data[pos + 1 :])
+        self.assertEqual(len(damage), 1)
+        self.assertEqual(sorted(recovered), [u"Game 0", u"Game 2"])
+        self.assertEqual(recovered[u"Game 2"], shortcuts[u"Game 2"])
+
+    def test_fuzz(self):
+        data = dump(library(50))
+        rand = random.Random(0)
+        for trial in range(1000):
+            damaged = bytearray(data)
+            if trial % 2:
+                damaged = damaged[: rand.randrange(len(damaged))]
+            else:
+                for _ in range(rand.randint(1, 8)):
+                    damaged[rand.randrange(len(damaged))] ^= 1 << rand.randrange(8)
+            recovered, damage = recover(str(damaged))
+            for values in recovered.itervalues():
+                self.assertIn("appname", values)
+            # Recovered shortcuts can be written back
+            dump(recovered)
+            if trial % 2:
+                self.assertTrue(damage)
+
+    def test_fuzz_scales_linearly(self):
+        def best_time(data):
+            times = []
+            for _ in range(3):
+                start = time.time()
+                recovered, damage = recover(data)
+                times.append(time.time() - start)
+            return min(times), recovered, damage
+
+        timings = []
+        for count in (1000, 4000):
+            # Every entry is damaged, so every entry needs a resync
+            data = dump(library(count)).replace("\x01exe\x00", "\x07exe\x00")
+            elapsed, recovered, damage = best_time(data)
+            self.assertEqual((len(recovered), len(damage)), (0, count))
+            timings.append(elapsed)
+        # Quadratic resyncing would take 16 times as long
+        self.assertLess(timings[1], 8 * timings[0])
+
+    def test_duplicates_are_kept(self):
+        first = shortcut(nonsteam, u"Game", u"a")
+        second = shortcut(nonsteam, u"Game", u"b")
+        third = shortcut(nonsteam, u"Game", u"c")
+        # dump_shortcuts() keys entries by appname, build the file by hand
+        data = "".join(
+            dump({key: values})[len(nonsteam.SHORTCUTS_HEADER) : -2]
+            for key, values in ((u"0", first), (u"1", second), (u"2", third))
+        )
+        data = nonsteam.SHORTCUTS_HEADER + data + "\x08\x08"
+        recovered, damage = recover(data)
+        self.assertEqual(damage, [])
+        self.assertEqual(len(recovered), 3)
+        self.assertEqual(recovered[u"Game"], first)
+        self.assertEqual(nonsteam.duplicate_shortcuts(recovered), [u"Game", u"Game"])
+
+        # Saving the file again keeps every duplicate
+        recovered, damage = recover(dump(recovered))
+        self.assertEqual(
+            sorted(values["exe"] for values in recovered.itervalues()),
+            [u'"a"', u'"b"', u'"c"'],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Tests for ShortcutPlan and for what the preview reports about Playnite actions.
+"""
+
+# Skips the tests on Python 3, so it comes first
+from playnite_stubs import import_nonsteam, shortcut
+
+import unittest
+
+nonsteam = import_nonsteam()
+
+
+class Action(object):
+    def __init__(self, path):
+        self.Path = path
+
+
+class Game(object):
+    def __init__(self, play_action):
+        self.PlayAction = play_action
+
+
+class ShortcutPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.steam_shortcuts = {
+            u"Same": shortcut(nonsteam, u"Same"),
+            u"Changed": shortcut(nonsteam, u"Changed", tags={u"0": u"favorite"}),
+            u"Steam only": shortcut(nonsteam, u"Steam only"),
+        }
+        changed = shortcut(nonsteam, u"Changed", u"new", launchoptions=u"-x")
+        # A field set by Steam and no longer planned
+        changed.pop("tags")
+        self.planned = {
+            u"Same": shortcut(nonsteam, u"Same"),
+            u"Changed": changed,
+            u"New": shortcut(nonsteam, u"New"),
+        }
+        self.plan = nonsteam.ShortcutPlan(self.steam_shortcuts, self.planned)
+
+    def test_plan(self):
+        self.assertEqual(self.plan.added, [u"New"])
+        self.assertEqual(
+            self.plan.updated, {u"Changed": ["exe", "launchoptions", "tags"]}
+        )
+        self.assertEqual(self.plan.unchanged, [u"Same"])
+        self.assertTrue(self.plan.has_changes())
+        self.assertEqual(
+            sorted(self.plan.shortcuts), [u"Changed", u"New", u"Same", u"Steam only"]
+        )
+        self.assertEqual(self.plan.shortcuts[u"Changed"], self.planned[u"Changed"])
+
+    def test_no_changes(self):
+        plan = nonsteam.ShortcutPlan(
+            self.steam_shortcuts, {u"Same": shortcut(nonsteam, u"Same")}
+        )
+        self.assertFalse(plan.has_changes())
+        self.assertEqual(
+            plan.describe(), "No changes to non-Steam shortcuts (1 unchanged)"
+        )
+
+    def test_describe(self):
+        self.assertEqual(
+            self.plan.describe(),
+            "1 non-Steam shortcut(s) will be created, 1 updated and 1 are unchanged"
+            "\n\nNew shortcuts:\nNew"
+            "\n\nUpdated shortcuts (changed fields):\n"
+            "Changed (exe, launchoptions, tags)",
+        )
+
+    def test_describe_is_capped(self):
+        planned = dict(
+            (u"Game {:02}".format(i), shortcut(nonsteam, u"Game {:02}".format(i)))
+            for i in range(12)
+        )
+        lines = nonsteam.ShortcutPlan({}, planned).describe().splitlines()
+        self.assertEqual(lines[-2:], [u"Game 09", "[...]"])
+
+    def test_merge_into(self):
+        # Steam changed the file after the plan was computed
+        newer = dict(self.steam_shortcuts)
+        newer[u"Changed"] = dict(
+            newer[u"Changed"], icon=u"steam.ico", tags={u"0": u"retro"}
+        )
+        newer[u"Same"] = dict(newer[u"Same"], launchoptions=u"-steam")
+        newer[u"Theirs"] = shortcut(nonsteam, u"Theirs")
+        del newer[u"Steam only"]
+        merged = self.plan.merge_into(newer)
+
+        self.assertEqual(sorted(merged), [u"Changed", u"New", u"Same", u"Theirs"])
+        # Planned fields win, fields the plan does not change keep Steam's value
+        expected = dict(self.planned[u"Changed"], icon=u"steam.ico")
+        self.assertEqual(merged[u"Changed"], expected)
+        self.assertEqual(merged[u"Same"], newer[u"Same"])
+        self.assertEqual(merged[u"New"], self.planned[u"New"])
+        self.assertEqual(merged[u"Theirs"], newer[u"Theirs"])
+
+    def test_merge_recreates_removed_shortcut(self):
+        newer = dict(self.steam_shortcuts)
+        del newer[u"Changed"]
+        merged = self.plan.merge_into(newer)
+        self.assertEqual(merged[u"Changed"], self.planned[u"Changed"])
+
+
+class PlayActionChangesTest(unittest.TestCase):
+    url = "steam://rungameid/1"
+
+    def test_first_run(self):
+        action = Action("game.exe")
+        self.assertTrue(nonsteam.play_action_changes(Game(action), action, self.url))
+
+    def test_up_to_date(self):
+        game = Game(Action(self.url))
+        self.assertFalse(
+            nonsteam.play_action_changes(game, Action("game.exe"), self.url)
+        )
+
+    def test_new_url(self):
+        game = Game(Action("steam://rungameid/2"))
+        self.assertTrue(
+            nonsteam.play_action_changes(game, Action("game.exe"), self.url)
+        )
+
+    def test_describe_action_changes(self):
+        self.assertEqual(
+            nonsteam.describe_action_changes([u"B", u"A"]),
+            "2 Playnite game(s) will be launched through Steam: A, B",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+Tests for ShortcutsLock and save_shortcuts(), including two processes updating
+the same shortcuts.vdf.
+"""
+
+# Skips the tests on Python 3, so it comes first
+from playnite_stubs import import_nonsteam, shortcut
+
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+nonsteam = import_nonsteam()
+
+WORKER_SHORTCUTS = 40
+
+
+def write_shortcuts(path, shortcuts):
+    with open(path, "wb") as f:
+        nonsteam.dump_shortcuts(f, shortcuts)
+
+
+def worker(shortcuts_vdf, tag):
+    """
+    Adds WORKER_SHORTCUTS shortcuts one at a time, each with a full
+    load/plan/save cycle, and changes the launch options of "Shared".
+    """
+    rand = random.Random(tag)
+    for i in range(WORKER_SHORTCUTS):
+        # The file is read without the lock, it must never be partly written
+        shortcuts, damage, signature = nonsteam.load_shortcuts(shortcuts_vdf)
+        assert not damage, damage
+        appname = u"{} {}".format(tag, i)
+        planned = {appname: shortcut(nonsteam, appname)}
+        planned[u"Shared"] = dict(
+            shortcuts[u"Shared"], launchoptions=u"{} {}".format(tag, i)
+        )
+        plan = nonsteam.ShortcutPlan(shortcuts, planned)
+        # Give the other process a chance to write in between
+        time.sleep(rand.uniform(0, 0.01))
+        with nonsteam.ShortcutsLock(shortcuts_vdf):
+            nonsteam.save_shortcuts(shortcuts_vdf, plan, signature)
+
+
+class ShortcutsLockTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.shortcuts_vdf = os.path.join(self.dir, "shortcuts.vdf")
+        self.lock_path = self.shortcuts_vdf + ".lock"
+        write_shortcuts(self.shortcuts_vdf, {u"Shared": shortcut(nonsteam, u"Shared")})
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_lock_file(self):
+        with nonsteam.ShortcutsLock(self.shortcuts_vdf) as lock:
+            with open(self.lock_path) as f:
+                self.assertEqual(f.read(), lock.token)
+        self.assertEqual(os.listdir(self.dir), ["shortcuts.vdf"])
+
+    def test_timeout(self):
+        timeout = nonsteam.SHORTCUTS_LOCK_TIMEOUT
+        nonsteam.SHORTCUTS_LOCK_TIMEOUT = 0.2
+        try:
+            with nonsteam.ShortcutsLock(self.shortcuts_vdf):
+                with self.assertRaises(IOError):
+                    with nonsteam.ShortcutsLock(self.shortcuts_vdf):
+                        pass
+        finally:
+            nonsteam.SHORTCUTS_LOCK_TIMEOUT = timeout
+        self.assertFalse(os.path.exists(self.lock_path))
+
+    def test_timeout_unreadable_lock(self):
+        # Neither readable nor removable as a lock, so it must be waited out
+        os.mkdir(self.lock_path)
+        os.utime(self.lock_path, (1, 1))
+        timeout = nonsteam.SHORTCUTS_LOCK_TIMEOUT
+        nonsteam.SHORTCUTS_LOCK_TIMEOUT = 0.5
+        try:
+            start = time.time()
+            with self.assertRaises(IOError):
+                with nonsteam.ShortcutsLock(self.shortcuts_vdf):
+                    pass
+            self.assertLess(time.time() - start, 5)
+        finally:
+            nonsteam.SHORTCUTS_LOCK_TIMEOUT = timeout
+        self.assertTrue(os.path.isdir(self.lock_path))
+
+    def test_unreadable_lock_is_not_removed(self):
+        os.mkdir(self.lock_path)
+        lock = nonsteam.ShortcutsLock(self.shortcuts_vdf)
+        self.assertFalse(lock.remove_if_owned_by("1 crashed"))
+        self.assertEqual(sorted(os.listdir(self.dir)), ["shortcuts.vdf", "shortcuts.vdf.lock"])
+
+    def test_stale_lock(self):
+        with open(self.lock_path, "w") as f:
+            f.write("1 crashed")
+        os.utime(self.lock_path, (1, 1))
+        with nonsteam.ShortcutsLock(self.shortcuts_vdf) as lock:
+            with open(self.lock_path) as f:
+                self.assertEqual(f.read(), lock.token)
+        self.assertEqual(os.listdir(self.dir), ["shortcuts.vdf"])
+
+    def test_other_lock_is_not_removed(self):
+        with nonsteam.ShortcutsLock(self.shortcuts_vdf):
+            # Another process broke this lock and took it over
+            os.remove(self.lock_path)
+            with open(self.lock_path, "w") as f:
+                f.write("2 other")
+        with open(self.lock_path) as f:
+            self.assertEqual(f.read(), "2 other")
+        self.assertEqual(sorted(os.listdir(self.dir)), ["shortcuts.vdf", "shortcuts.vdf.lock"])
+
+    def test_stale_check_race(self):
+        # The lock was judged stale, but replaced by a fresh lock before it
+        # could be removed
+        with open(self.lock_path, "w") as f:
+            f.write("3 fresh")
+        lock = nonsteam.ShortcutsLock(self.shortcuts_vdf)
+        self.assertFalse(lock.remove_if_owned_by("1 crashed"))
+        with open(self.lock_path) as f:
+            self.assertEqual(f.read(), "3 fresh")
+
+    def test_save_merges_concurrent_changes(self):
+        shortcuts, damage, signature = nonsteam.load_shortcuts(self.shortcuts_vdf)
+        plan = nonsteam.ShortcutPlan(shortcuts, {u"Mine": shortcut(nonsteam, u"Mine")})
+        # Steam adds a shortcut after the file was loaded
+        shortcuts = dict(shortcuts)
+        shortcuts[u"Theirs"] = shortcut(nonsteam, u"Theirs")
+        write_shortcuts(self.shortcuts_vdf, shortcuts)
+        with nonsteam.ShortcutsLock(self.shortcuts_vdf):
+            self.assertTrue(nonsteam.save_shortcuts(self.shortcuts_vdf, plan, signature))
+        shortcuts, damage, signature = nonsteam.load_shortcuts(self.shortcuts_vdf)
+        self.assertEqual(sorted(shortcuts), [u"Mine", u"Shared", u"Theirs"])
+
+    def test_two_processes(self):
+        workers = [
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "worker", self.shortcuts_vdf, tag]
+            )
+            for tag in ("A", "B")
+        ]
+        self.assertEqual([process.wait() for process in workers], [0, 0])
+        shortcuts, damage, signature = nonsteam.load_shortcuts(self.shortcuts_vdf)
+        self.assertEqual(damage, [])
+        self.assertEqual(len(shortcuts), 2 * WORKER_SHORTCUTS + 1)
+        self.assertIn(
+            shortcuts[u"Shared"]["launchoptions"],
+            (u"A {}".format(WORKER_SHORTCUTS - 1), u"B {}".format(WORKER_SHORTCUTS - 1)),
+        )
+        self.assertEqual(os.listdir(self.dir), ["shortcuts.vdf"])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["worker"]:
+        worker(*sys.argv[2:])
+    else:
+        unittest.main()
@@ -0,0 +1,48 @@
+"""
+Tests for steam_shortcut_ids() and the rungameid URLs.
+"""
+
+# Skips the tests on Python 3, so it comes first
+from playnite_stubs import import_nonsteam
+
+import binascii
+import random
+import unittest
+
+nonsteam = import_nonsteam()
+
+
+def expected_id(shortcut):
+    data = shortcut["exe"].encode("utf-8") + shortcut["appname"].encode("utf-8")
+    return (binascii.crc32(data) & 0xFFFFFFFF) | 0x80000000
+
+
+class SteamShortcutIdsTest(unittest.TestCase):
+    def test_rungameid_URL(self):
+        self.assertEqual(
+            nonsteam.steam_rungameid_URL(0x12345678),
+            "steam://rungameid/{}".format((0x92345678 << 32) | 0x02000000),
+        )
+
+    def test_ids(self):
+        rand = random.Random(0)
+        # More shared exes than fit in the cache, and exes used only once
+        exes = [u'"C:\\Emulators\\{}.exe"'.format(i) for i in range(40)]
+        shortcuts = []
+        for i in range(2000):
+            if i % 3:
+                exe = rand.choice(exes)
+            else:
+                exe = u'"C:\\Games\\{}.exe"'.format(i)
+            shortcuts.append({"exe": exe, "appname": u"Game {} \u00e9".format(i)})
+        self.assertEqual(
+            nonsteam.steam_shortcut_ids(shortcuts),
+            [expected_id(shortcut) for shortcut in shortcuts],
+        )
+
+    def test_empty(self):
+        self.assertEqual(nonsteam.steam_shortcut_ids([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()